@@ -4,6 +4,7 @@
 
 from .accounts import AccountsTool
 from .categories import CategoresTool
+from .duplicates import DuplicatesTool
 from .export import DataExportTool
 from .merchants import MerchantsTool
 from .transaction_detail import TransactionDetailTool
@@ -16,4 +17,5 @@ __all__ = [
     "AccountsTool",
     "CategoresTool",
     "MerchantsTool",
+    "DuplicatesTool",
 ]
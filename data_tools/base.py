@@ -19,3 +19,9 @@ class BaseDataTool(ABC):
     ) -> CallToolResult:
         """Выполнение инструмента"""
         pass
+
+    @staticmethod
+    def _limit(args: Dict[str, Any], default: int) -> int:
+        """Лимит из аргументов: null - значение по умолчанию, отрицательный - 0"""
+        limit = args.get("limit")
+        return default if limit is None else max(int(limit), 0)
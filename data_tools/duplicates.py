@@ -0,0 +1,63 @@
+"""
+Поиск дублей транзакций
+"""
+
+from typing import Any, Dict
+
+from mcp.types import CallToolResult, TextContent
+
+from models.transaction import TransactionFilter
+from src.client import ZenMoneyClient
+from utils.filtering import find_duplicates
+
+from .base import BaseDataTool
+
+
+class DuplicatesTool(BaseDataTool):
+    """Поиск возможных дублей транзакций за период"""
+
+    async def execute(
+        self, client: ZenMoneyClient, args: Dict[str, Any]
+    ) -> CallToolResult:
+        """Поиск дублей"""
+        snapshot = await client.get_snapshot()
+
+        filter_params = TransactionFilter(
+            year=args.get("year"),
+            month=args.get("month"),
+            day=args.get("day"),
+            date_from=args.get("date_from"),
+            date_to=args.get("date_to"),
+        )
+        # Группы ищутся по сырым записям, модели строятся только для вывода
+        window_days = args.get("window_days")
+        window_days = 0 if window_days is None else max(int(window_days), 0)
+        groups = find_duplicates(
+            snapshot.select_records(filter_params), window_days=window_days
+        )
+
+        if not groups:
+            return CallToolResult(
+                content=[TextContent(type="text", text="✅ Дубли не найдены")]
+            )
+
+        limit = self._limit(args, 20)
+        show_ids = args.get("show_ids", False)
+
+        result = f"🔍 Найдено групп возможных дублей: {len(groups)}\n\n"
+        for i, keys in enumerate(groups[:limit], 1):
+            group = [t for t in map(snapshot.get_transaction, keys) if t is not None]
+            first = group[0]
+            payee = first.payee or "Без получателя"
+            result += f"{i:2d}. {payee} | {first.amount:+.2f} ₽ | {len(group)} шт.\n"
+            for t in group:
+                line = f"    {t.date}"
+                if show_ids:
+                    line += f" | ID: {t.id}"
+                result += line + "\n"
+            result += "\n"
+
+        if len(groups) > limit:
+            result += f"... и еще {len(groups) - limit} групп"
+
+        return CallToolResult(content=[TextContent(type="text", text=result)])
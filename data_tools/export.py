@@ -5,16 +5,16 @@
 import csv
 import io
 import json
-from typing import TYPE_CHECKING, Any, Dict, List
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Dict
 
 if TYPE_CHECKING:
     from models.transaction import Transaction
 
 from mcp.types import CallToolResult, TextContent
 
-from models.transaction import TransactionFilter
+from models.transaction import EXPENSE, INCOME, OTHER, TRANSFER, TransactionFilter
 from src.client import ZenMoneyClient
-from utils.filtering import filter_transactions
 
 from .base import BaseDataTool
 
@@ -26,8 +26,8 @@ class DataExportTool(BaseDataTool):
         self, client: ZenMoneyClient, args: Dict[str, Any]
     ) -> CallToolResult:
         """Экспорт транзакций"""
-        transactions = await client.get_transactions()
-        categories = await client.get_categories()
+        snapshot = await client.get_snapshot()
+        resolver = snapshot.category_resolver
 
         # Фильтрация
         filter_params = TransactionFilter(
@@ -38,20 +38,17 @@ class DataExportTool(BaseDataTool):
             date_to=args.get("date_to"),
         )
 
-        filtered = filter_transactions(transactions, filter_params)
+        transactions = snapshot.iter_transactions(filter_params)
 
         # Фильтрация по типу транзакций
+        kinds = snapshot.kinds
         transaction_type = args.get("transaction_type", "all")
-        if transaction_type == "income":
-            filtered = [t for t in filtered if hasattr(t, "is_income") and t.is_income]
-        elif transaction_type == "expense":
-            filtered = [t for t in filtered if t.is_expense(filtered) is True]
-        elif transaction_type == "transfer":
-            filtered = [t for t in filtered if t.is_transfer(filtered) is True]
+        if transaction_type in (INCOME, EXPENSE, TRANSFER):
+            transactions = (t for t in transactions if kinds[t.id] == transaction_type)
 
-        # Лимит
-        limit = args.get("limit", 1000)
-        filtered = filtered[:limit]
+        # Лимит: выборка останавливается на нем
+        limit = self._limit(args, 1000)
+        filtered = list(islice(transactions, limit))
 
         if not filtered:
             return CallToolResult(
@@ -63,9 +60,7 @@ class DataExportTool(BaseDataTool):
         # Подготовка данных
         export_data = []
         for t in filtered:
-            cat_name = "Без категории"
-            if t.category and t.category in categories:
-                cat_name = categories[t.category].title
+            cat_name = resolver.title(t.category)
 
             export_data.append(
                 {
@@ -77,7 +72,7 @@ class DataExportTool(BaseDataTool):
                     "payee": t.payee or "",
                     "category": cat_name,
                     "comment": t.comment or "",
-                    "type": self._get_transaction_type(t, filtered),
+                    "type": self._get_transaction_type(t, kinds),
                 }
             )
 
@@ -105,14 +100,7 @@ class DataExportTool(BaseDataTool):
         return CallToolResult(content=[TextContent(type="text", text=result_text)])
 
     def _get_transaction_type(
-        self, transaction: "Transaction", all_transactions: List["Transaction"]
+        self, transaction: "Transaction", kinds: Dict[str, str]
     ) -> str:
         """Определение типа транзакции"""
-        if hasattr(transaction, "is_income") and transaction.is_income:
-            return "income"
-        elif transaction.is_expense(all_transactions) is True:
-            return "expense"
-        elif transaction.is_transfer(all_transactions) is True:
-            return "transfer"
-        else:
-            return "other"
+        return kinds.get(transaction.id, OTHER)
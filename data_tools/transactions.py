@@ -2,14 +2,16 @@
 Получение транзакций
 """
 
-from typing import Any, Dict
+from itertools import islice
+from typing import Any, Dict, Optional, Set
 
 from mcp.types import CallToolResult, TextContent
 
 from models.transaction import TransactionFilter
 from src.client import ZenMoneyClient
-from utils.filtering import filter_transactions, get_transaction_category_name
+from utils.categories import UNCATEGORIZED
 from utils.formatting import format_transactions
+from utils.indexing import KeySet, intersect
 
 from .base import BaseDataTool
 
@@ -21,8 +23,8 @@ class TransactionsTool(BaseDataTool):
         self, client: ZenMoneyClient, args: Dict[str, Any]
     ) -> CallToolResult:
         """Получение транзакций"""
-        transactions = await client.get_transactions()
-        categories = await client.get_categories()
+        snapshot = await client.get_snapshot()
+        resolver = snapshot.category_resolver
 
         # Фильтрация по дате
         filter_params = TransactionFilter(
@@ -33,52 +35,58 @@ class TransactionsTool(BaseDataTool):
             date_to=args.get("date_to"),
         )
 
-        filtered = filter_transactions(transactions, filter_params)
+        # Кандидаты из индексов снимка вместо просмотра всех транзакций
+        keys: Optional[KeySet] = None
 
         # Фильтрация по получателю
         payee = args.get("payee")
         if payee:
-            payee_lower = payee.lower()
-            filtered = [
-                t for t in filtered if t.payee and payee_lower in t.payee.lower()
-            ]
+            keys = snapshot.indexes.payee_keys(payee)
 
-        # Фильтрация по категориям
+        # Поиск по комментарию
+        comment = args.get("comment")
+        if comment:
+            keys = intersect(keys, snapshot.indexes.comment_keys(comment))
+
+        # Фильтрация по категориям (родительская включает вложенные)
         categories_filter = args.get("category")
+        category_ids: Set[str] = set()
+        category_names: Set[str] = set()
         if categories_filter:
-            category_ids = set()
-            category_names = set()
-
             for category in categories_filter:
-                if category in categories:
-                    # Это ID категории
-                    category_ids.add(category)
-                    category_names.add(categories[category].title)
+                found = resolver.resolve(category)
+                if found:
+                    category_ids.update(resolver.with_descendants(found))
                 else:
-                    # Ищем по названию категории
-                    category_lower = category.lower()
-                    found = False
-                    for cat_id, cat_obj in categories.items():
-                        if cat_obj.title.lower() == category_lower:
-                            category_ids.add(cat_id)
-                            category_names.add(cat_obj.title)
-                            found = True
-                            break
-
-                    # Если не найдено среди категорий, добавляем как название
-                    if not found:
-                        category_names.add(category)
+                    # Если не найдено среди категорий, сравниваем по названию
+                    category_names.add(category)
 
+            # Транзакции без категории в индексе не найти
+            if UNCATEGORIZED not in category_names:
+                keys = intersect(keys, snapshot.indexes.category_keys(category_ids))
+
+        # Ленивая выборка от новых к старым: чтение останавливается, как только
+        # набран лимит
+        transactions = snapshot.iter_transactions(
+            filter_params, keys, newest_first=True
+        )
+
+        if categories_filter:
             # Применяем фильтр используя ту же логику, что и в отчетах
-            filtered = [
+            transactions = (
                 t
-                for t in filtered
-                if get_transaction_category_name(t, categories) in category_names
-            ]
+                for t in transactions
+                if resolver.category_id(t) in category_ids
+                or resolver.name_of(t) in category_names
+            )
 
-        limit = args.get("limit", 50)
-        filtered = filtered[:limit]
+        limit = self._limit(args, 50)
+        # Одна лишняя транзакция показывает, что выборка обрезана
+        selected = list(islice(transactions, limit + 1))
+        has_more = len(selected) > limit
 
         show_ids = args.get("show_ids", False)
-        result = format_transactions(filtered, show_ids=show_ids)
+        result = format_transactions(
+            selected[:limit], limit=limit, show_ids=show_ids, has_more=has_more
+        )
         return CallToolResult(content=[TextContent(type="text", text=result)])
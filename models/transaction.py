@@ -2,7 +2,8 @@
 Модели транзакций
 """
 
-from typing import List, Optional
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from pydantic import BaseModel
 
@@ -149,6 +150,68 @@ class Transaction(BaseModel):
         return False
 
 
+# Типы операций
+INCOME = "income"
+EXPENSE = "expense"
+TRANSFER = "transfer"
+OTHER = "other"
+
+# Поля, по которым определяется тип операции:
+# (id, date, income, outcome, incomeAccount, outcomeAccount)
+TransactionRow = Tuple[
+    str, str, Optional[float], Optional[float], Optional[str], Optional[str]
+]
+
+
+def record_row(record: Dict[str, Any]) -> TransactionRow:
+    """Поля сырой записи diff API для определения типа операции"""
+    return (
+        record["id"],
+        record["date"],
+        record.get("income"),
+        record.get("outcome"),
+        record.get("incomeAccount"),
+        record.get("outcomeAccount"),
+    )
+
+
+def classify_rows(
+    rows: Iterable[TransactionRow], tolerance: float = 0.01
+) -> Dict[str, str]:
+    """Тип каждой операции (INCOME, EXPENSE, TRANSFER, OTHER) за один проход
+
+    Совпадает с is_transfer(all)/is_income/is_expense(all) для каждой
+    транзакции, но доходы индексируются по (дата, сумма в долях tolerance),
+    и для расхода проверяются только соседние корзины, а не весь список
+    """
+    rows = list(rows)
+    incomes: Dict[Tuple[str, int], List[str]] = defaultdict(list)
+    for row_id, date, income, _, _, _ in rows:
+        if income and income > 0:
+            incomes[(date, round(income / tolerance))].append(row_id)
+    income_amounts = {row[0]: row[2] or 0.0 for row in rows}
+
+    kinds: Dict[str, str] = {}
+    for row_id, date, income, outcome, income_account, outcome_account in rows:
+        if income_account and outcome_account and income_account != outcome_account:
+            kinds[row_id] = TRANSFER
+        elif outcome and outcome > 0:
+            # Суммы в пределах tolerance попадают в ту же или соседнюю корзину
+            bucket = round(outcome / tolerance)
+            paired = any(
+                other_id != row_id
+                and abs(outcome - income_amounts[other_id]) < tolerance
+                for key in (bucket - 1, bucket, bucket + 1)
+                for other_id in incomes.get((date, key), ())
+            )
+            kinds[row_id] = TRANSFER if paired else EXPENSE
+        elif income and income > 0:
+            kinds[row_id] = INCOME
+        else:
+            kinds[row_id] = OTHER
+    return kinds
+
+
 class TransactionFilter(BaseModel):
     """Фильтр для транзакций"""
 
@@ -9,6 +9,8 @@ from mcp.types import CallToolResult
 
 from models.transaction import TransactionFilter
 from src.client import ZenMoneyClient
+from utils.aggregation import Aggregation
+from utils.filtering import filter_months
 
 
 class BaseReport(ABC):
@@ -21,6 +23,20 @@ class BaseReport(ABC):
         """Генерация отчета"""
         pass
 
+    async def _aggregate(
+        self, client: ZenMoneyClient, filter_params: TransactionFilter
+    ) -> Aggregation:
+        """Сводка по транзакциям периода
+
+        Целые месяцы и годы собираются из помесячных сводок снимка,
+        остальные периоды - по колонкам снимка
+        """
+        snapshot = await client.get_snapshot()
+        months = filter_months(filter_params)
+        if months is not None:
+            return snapshot.summarize_months(months)
+        return snapshot.summarize(filter_params)
+
     def _create_filter_params(self, args: Dict[str, Any]) -> TransactionFilter:
         """Создание параметров фильтрации из аргументов"""
         return TransactionFilter(
@@ -6,8 +6,8 @@ from typing import Any, Dict
 
 from mcp.types import CallToolResult, TextContent
 
+from models.transaction import EXPENSE, INCOME, TRANSFER
 from src.client import ZenMoneyClient
-from utils.filtering import filter_transactions
 
 from .base import BaseReport
 
@@ -19,26 +19,21 @@ class CashFlowReport(BaseReport):
         self, client: ZenMoneyClient, args: Dict[str, Any]
     ) -> CallToolResult:
         """Генерация отчета по денежному потоку"""
-        transactions = await client.get_transactions()
+        summary = await self._aggregate(client, self._create_filter_params(args))
+        incomes = summary.kind(INCOME)
+        expenses = summary.kind(EXPENSE)
+        transfers = summary.kind(TRANSFER)
 
-        filter_params = self._create_filter_params(args)
-        filtered = filter_transactions(transactions, filter_params)
-
-        # Используем правильную логику для определения доходов и расходов
-        incomes = [t for t in filtered if hasattr(t, "is_income") and t.is_income]
-        expenses = [t for t in filtered if t.is_expense(filtered) is True]
-        transfers = [t for t in filtered if t.is_transfer(filtered) is True]
-
-        total_income = sum(t.income or 0.0 for t in incomes if t.income)
-        total_expenses = sum(t.outcome or 0.0 for t in expenses if t.outcome)
+        total_income = incomes.total
+        total_expenses = expenses.total
         net_flow = total_income - total_expenses
 
         period_desc = self._get_period_description(args)
         result = f"💰 Денежный поток за {period_desc}\n\n"
 
-        result += f"📈 Доходы: +{total_income:,.2f} ₽ ({len(incomes)} операций)\n"
-        result += f"📉 Расходы: -{total_expenses:,.2f} ₽ ({len(expenses)} операций)\n"
-        result += f"🔄 Переводы: {len(transfers)} операций (исключены из расчета)\n\n"
+        result += f"📈 Доходы: +{total_income:,.2f} ₽ ({incomes.count} операций)\n"
+        result += f"📉 Расходы: -{total_expenses:,.2f} ₽ ({expenses.count} операций)\n"
+        result += f"🔄 Переводы: {transfers.count} операций (исключены из расчета)\n\n"
 
         result += f"💵 Чистый поток: {net_flow:+,.2f} ₽\n"
 
@@ -50,10 +45,10 @@ class CashFlowReport(BaseReport):
             result += "⚖️ Нулевой денежный поток (доходы равны расходам)\n"
 
         # Дополнительная статистика
-        if incomes and expenses:
+        if incomes.count and expenses.count:
             result += "\n📊 Статистика:\n"
-            result += f"  Средний доход: {total_income / len(incomes):,.2f} ₽\n"
-            result += f"  Средний расход: {total_expenses / len(expenses):,.2f} ₽\n"
+            result += f"  Средний доход: {incomes.average:,.2f} ₽\n"
+            result += f"  Средний расход: {expenses.average:,.2f} ₽\n"
             result += (
                 f"  Соотношение доходы/расходы: {total_income / total_expenses:.2f}\n"
             )
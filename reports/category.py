@@ -2,13 +2,11 @@
 Отчет по категориям
 """
 
-from collections import defaultdict
 from typing import Any, Dict
 
 from mcp.types import CallToolResult, TextContent
 
 from src.client import ZenMoneyClient
-from utils.filtering import filter_transactions, get_transaction_category_name
 
 from .base import BaseReport
 
@@ -20,27 +18,7 @@ class CategoryBreakdownReport(BaseReport):
         self, client: ZenMoneyClient, args: Dict[str, Any]
     ) -> CallToolResult:
         """Генерация отчета по категориям"""
-        transactions = await client.get_transactions()
-        categories = await client.get_categories()
-
-        filter_params = self._create_filter_params(args)
-
-        filtered = filter_transactions(transactions, filter_params)
-
-        by_category: Dict[str, Dict[str, float]] = defaultdict(
-            lambda: {"count": 0, "income": 0, "outcome": 0}
-        )
-
-        for t in filtered:
-            cat_name = get_transaction_category_name(t, categories)
-
-            by_category[cat_name]["count"] += 1
-
-            # Используем правильную логику для доходов и расходов
-            if hasattr(t, "is_income") and t.is_income:
-                by_category[cat_name]["income"] += t.income or 0.0
-            elif t.is_expense(filtered):
-                by_category[cat_name]["outcome"] += t.outcome or 0.0
+        summary = await self._aggregate(client, self._create_filter_params(args))
 
         result = f"📊 Разбивка по категориям за {args['year']}"
         if args.get("month"):
@@ -48,17 +26,20 @@ class CategoryBreakdownReport(BaseReport):
         result += "\n\n"
 
         sorted_cats = sorted(
-            by_category.items(), key=lambda x: x[1]["outcome"], reverse=True
+            summary.by_category.items(),
+            key=lambda x: x[1].outcome.kopecks,
+            reverse=True,
         )
 
         for cat_name, data in sorted_cats:
-            if data["count"] > 0:  # Показываем только категории с транзакциями
-                result += f"{cat_name}:\n"
-                result += f"  Транзакций: {data['count']}\n"
-                if data["income"] > 0:
-                    result += f"  Доходы: +{data['income']:,.2f} ₽\n"
-                if data["outcome"] > 0:
-                    result += f"  Расходы: -{data['outcome']:,.2f} ₽\n"
-                result += f"  Баланс: {data['income'] - data['outcome']:+,.2f} ₽\n\n"
+            income = data.income.total
+            outcome = data.outcome.total
+            result += f"{cat_name}:\n"
+            result += f"  Транзакций: {data.count}\n"
+            if income > 0:
+                result += f"  Доходы: +{income:,.2f} ₽\n"
+            if outcome > 0:
+                result += f"  Расходы: -{outcome:,.2f} ₽\n"
+            result += f"  Баланс: {income - outcome:+,.2f} ₽\n\n"
 
         return CallToolResult(content=[TextContent(type="text", text=result)])
@@ -2,14 +2,12 @@
 Отчет по доходам
 """
 
-from collections import defaultdict
 from typing import Any, Dict
 
 from mcp.types import CallToolResult, TextContent
 
-from models.transaction import TransactionFilter
+from models.transaction import INCOME, TransactionFilter
 from src.client import ZenMoneyClient
-from utils.filtering import filter_transactions
 
 from .base import BaseReport
 
@@ -21,41 +19,24 @@ class IncomeAnalysisReport(BaseReport):
         self, client: ZenMoneyClient, args: Dict[str, Any]
     ) -> CallToolResult:
         """Генерация отчета по доходам"""
-        transactions = await client.get_transactions()
-        categories = await client.get_categories()
-
         filter_params = TransactionFilter(
             year=args.get("year"), month=args.get("month")
         )
+        summary = await self._aggregate(client, filter_params)
+        incomes = summary.kind(INCOME)
 
-        filtered = filter_transactions(transactions, filter_params)
-        # Используем правильную логику для определения доходов
-        incomes = [t for t in filtered if hasattr(t, "is_income") and t.is_income]
-
-        if not incomes:
+        if not incomes.count:
             return CallToolResult(
                 content=[
                     TextContent(type="text", text="📊 Доходы за период не найдены")
                 ]
             )
 
-        total_income = sum(t.income or 0.0 for t in incomes if t.income)
-        by_source: Dict[str, Dict[str, float]] = defaultdict(
-            lambda: {"count": 0, "total": 0}
-        )
-        by_category: Dict[str, float] = defaultdict(float)
-
-        # Группировка по источникам (payee)
-        for t in incomes:
-            source = t.payee or "Неизвестный источник"
-            by_source[source]["count"] += 1
-            by_source[source]["total"] += t.income or 0.0
-
-            # Группировка по категориям
-            cat_name = "Без категории"
-            if t.category and t.category in categories:
-                cat_name = categories[t.category].title
-            by_category[cat_name] += t.income or 0.0
+        total_income = incomes.total
+        by_category = {
+            cat_name: data.income.total
+            for cat_name, data in summary.by_category.items()
+        }
 
         result = f"💰 Анализ доходов за {args['year']}"
         if args.get("month"):
@@ -63,20 +44,19 @@ class IncomeAnalysisReport(BaseReport):
         result += "\n\n"
 
         result += f"Общие доходы: +{total_income:,.2f} ₽\n"
-        result += f"Количество операций: {len(incomes)}\n"
-        result += f"Средний доход: {total_income / len(incomes):,.2f} ₽\n\n"
+        result += f"Количество операций: {incomes.count}\n"
+        result += f"Средний доход: {incomes.average:,.2f} ₽\n\n"
 
-        # Топ источников доходов
+        # Топ источников доходов (payee)
         sorted_sources = sorted(
-            by_source.items(), key=lambda x: x[1]["total"], reverse=True
+            summary.income_sources.items(), key=lambda x: x[1].kopecks, reverse=True
         )
         result += "📈 Источники доходов:\n"
         for i, (source, data) in enumerate(sorted_sources[:10], 1):
-            avg = data["total"] / data["count"]
             result += f"{i:2d}. {source}\n"
-            result += f"    Сумма: +{data['total']:,.2f} ₽\n"
-            result += f"    Операций: {data['count']}\n"
-            result += f"    Средняя сумма: {avg:,.2f} ₽\n\n"
+            result += f"    Сумма: +{data.total:,.2f} ₽\n"
+            result += f"    Операций: {data.count}\n"
+            result += f"    Средняя сумма: {data.average:,.2f} ₽\n\n"
 
         # По категориям
         if any(by_category.values()):
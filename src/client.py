@@ -2,98 +2,368 @@
 API клиент для ДзенМани
 """
 
+import asyncio
+import hashlib
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
-import requests
+import httpx
 
 from models.account import Account
 from models.category import Category
 from models.transaction import Transaction
+from src.snapshot import DataSnapshot, entity_key
+from src.storage import SnapshotFile, SQLiteStore
+from src.streaming import DiffStreamParser
+from utils.caching import ResultCache, normalize_arguments
+
+# Сколько записей копится перед сохранением в хранилище во время загрузки
+STORE_BATCH_SIZE = 2000
+
+# Сколько результатов инструментов хранится для текущей версии снимка
+RESULT_CACHE_SIZE = 128
+
+# Задержка записи файла снимка после изменения данных, секунд: изменения
+# за это время попадают в одну запись
+SNAPSHOT_SAVE_DELAY = 30.0
+
+T = TypeVar("T")
+
+# Клиент, снимок которого уже синхронизирован в рамках текущего вызова
+_pinned_client: ContextVar[Optional["ZenMoneyClient"]] = ContextVar(
+    "pinned_client", default=None
+)
+
+
+def create_http_session() -> httpx.AsyncClient:
+    """Асинхронная HTTP-сессия с пулом keep-alive соединений"""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(60.0, connect=10.0),
+        limits=httpx.Limits(
+            max_connections=10, max_keepalive_connections=5, keepalive_expiry=300
+        ),
+    )
 
 
 class ZenMoneyClient:
     """Клиент для работы с API ДзенМани"""
 
-    def __init__(self, token: str, base_url: str = "https://api.zenmoney.ru"):
+    def __init__(
+        self,
+        token: str,
+        base_url: str = "https://api.zenmoney.ru",
+        session: Optional[httpx.AsyncClient] = None,
+        cache_ttl: float = 0.0,
+        store: Optional[SQLiteStore] = None,
+        snapshot_file: Optional[SnapshotFile] = None,
+        save_delay: float = SNAPSHOT_SAVE_DELAY,
+    ):
         self.token = token
         self.base_url = base_url
         self.headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
+        self.snapshot = DataSnapshot()
+        # Окно свежести снимка в секундах (0 - синхронизация на каждый вызов)
+        self.cache_ttl = cache_ttl
+        self._synced_at: Optional[float] = None
+        # Общая сессия принадлежит серверу, собственную закрываем сами
+        self._owns_session = session is None
+        self.session = session or create_http_session()
+        # Текущая синхронизация, общая для всех конкурентных вызовов
+        self._sync_task: Optional[asyncio.Task[DataSnapshot]] = None
+        # Локальное хранилище: при старте снимок читается с диска
+        self.store = store
+        self.snapshot_file = snapshot_file
+        self._restored = store is None and snapshot_file is None
+        self._saved_version = 0
+        self.save_delay = save_delay
+        # Отложенная запись файла снимка
+        self._save_task: Optional[asyncio.Task[None]] = None
+        # Изменение снимка и его сериализация в файл не пересекаются
+        self._write_lock = asyncio.Lock()
+        # Результаты инструментов для текущей версии снимка
+        self.results = ResultCache(RESULT_CACHE_SIZE)
 
-    async def get_data(self) -> Dict[str, Any]:
-        """Получение всех данных через diff API"""
+    @property
+    def owner_key(self) -> str:
+        """Ключ пользователя в локальном хранилище (без самого токена)"""
+        return hashlib.sha256(self.token.encode()).hexdigest()[:16]
+
+    async def aclose(self) -> None:
+        """Запись отложенного файла снимка и закрытие собственной HTTP-сессии"""
+        if self._save_task is not None:
+            self._save_task.cancel()
+            self._save_task = None
+        await self.save_snapshot()
+        if self._owns_session:
+            await self.session.aclose()
+
+    async def _stream_diff(self, payload: Dict[str, Any]) -> Set[Tuple[str, str]]:
+        """Запрос к diff API с применением записей по мере получения
+
+        Тело ответа не собирается целиком: каждая запись попадает в снимок
+        сразу после разбора, а прочитанный текст отбрасывается.
+        Возвращает (тип, ключ) полученных сущностей
+        """
         url = f"{self.base_url}/v8/diff/"
+        parser = DiffStreamParser()
+        pending: Dict[str, List[Any]] = {}
+        pending_count = 0
+        received: Set[Tuple[str, str]] = set()
+
+        async with self._write_lock:
+            async with self.session.stream(
+                "POST", url, json=payload, headers=self.headers
+            ) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_text():
+                    for entity_type, record in parser.feed(chunk):
+                        if entity_type == "deletion":
+                            self.snapshot.apply_deletion(record)
+                        else:
+                            self.snapshot.apply_record(entity_type, record)
+                            received.add((entity_type, entity_key(entity_type, record)))
+                        if self.store is not None:
+                            pending.setdefault(entity_type, []).append(record)
+                            pending_count += 1
+
+                    if pending_count >= STORE_BATCH_SIZE:
+                        await self._persist(pending)
+                        pending, pending_count = {}, 0
+
+            parser.close()
+            self.snapshot.commit(parser.scalars.get("serverTimestamp") or 0)
+            await self._persist(pending)
+        return received
+
+    async def sync(self) -> DataSnapshot:
+        """Инкрементальная синхронизация снимка через diff API
+
+        Конкурентные вызовы ожидают один и тот же запрос к API
+        """
+        if self._sync_task is None:
+            self._sync_task = asyncio.ensure_future(self._sync())
+            self._sync_task.add_done_callback(self._reset_sync_task)
+        return await asyncio.shield(self._sync_task)
+
+    def _reset_sync_task(self, task: "asyncio.Task[DataSnapshot]") -> None:
+        if self._sync_task is task:
+            self._sync_task = None
+
+    async def _restore(self) -> None:
+        """Загрузка снимка из файла снимка или локального хранилища
+
+        Хранилище получает только дельты, поэтому файл используется, лишь
+        если хранилище не новее его, а отстающее хранилище сначала
+        заполняется из файла. Иначе при потере файла история пропала бы
+        """
+        self._restored = True
+        if self.snapshot_file is not None:
+            snapshot = await asyncio.to_thread(self.snapshot_file.load, self.owner_key)
+            if snapshot is not None and await self._reconcile_store(snapshot):
+                self.snapshot = snapshot
+                self._saved_version = snapshot.version
+                return
+        if self.store is not None:
+            data = await asyncio.to_thread(self.store.load, self.owner_key)
+            if data:
+                self.snapshot.apply_diff(data)
+
+    async def _reconcile_store(self, snapshot: DataSnapshot) -> bool:
+        """Согласование хранилища с файлом снимка
+
+        Возвращает False, если хранилище новее файла и грузиться нужно из него
+        """
+        if self.store is None:
+            return True
+        stored = await asyncio.to_thread(self.store.server_timestamp, self.owner_key)
+        if stored is not None and stored > snapshot.server_timestamp:
+            return False
+        if stored is None or stored < snapshot.server_timestamp:
+            await asyncio.to_thread(
+                self.store.replace,
+                self.owner_key,
+                snapshot.to_dict(),
+                snapshot.server_timestamp,
+            )
+        return True
+
+    def _schedule_save(self) -> None:
+        """Отложенная запись файла снимка в фоне, вне пути запроса"""
+        if self.snapshot_file is None or self._save_task is not None:
+            return
+        if self.snapshot.version == self._saved_version:
+            return
+        self._save_task = asyncio.ensure_future(self._save_later())
+
+    async def _save_later(self) -> None:
+        try:
+            await asyncio.sleep(self.save_delay)
+            await self.save_snapshot()
+        finally:
+            self._save_task = None
+
+    async def save_snapshot(self) -> None:
+        """Запись файла снимка, если данные изменились
+
+        Цикл событий только копирует словари снимка, сериализация и запись
+        идут в потоке. Применение diff на это время откладывается
+        """
+        if self.snapshot_file is None or self.snapshot.version == self._saved_version:
+            return
+        async with self._write_lock:
+            version = self.snapshot.version
+            frozen = self.snapshot.frozen_copy()
+            data = await asyncio.to_thread(SnapshotFile.dumps, frozen)
+        await asyncio.to_thread(self.snapshot_file.save, self.owner_key, data)
+        self._saved_version = max(self._saved_version, version)
+
+    async def _apply(self, diff: Dict[str, Any]) -> None:
+        """Применение изменений к снимку и локальному хранилищу"""
+        async with self._write_lock:
+            self.snapshot.apply_diff(diff)
+        await self._persist(diff)
+
+    async def _persist(self, diff: Dict[str, Any]) -> None:
+        """Сохранение изменений в локальное хранилище"""
+        if self.store is not None:
+            await asyncio.to_thread(
+                self.store.save_diff,
+                self.owner_key,
+                diff,
+                self.snapshot.server_timestamp,
+            )
+
+    async def _sync(self) -> DataSnapshot:
+        """Запрос изменений с последнего serverTimestamp"""
+        if not self._restored:
+            await self._restore()
+
         payload = {
-            "serverTimestamp": 0,
+            "serverTimestamp": self.snapshot.server_timestamp,
             "currentClientTimestamp": int(datetime.now().timestamp()),
         }
 
-        response = requests.post(url, json=payload, headers=self.headers)
-        response.raise_for_status()
-        result: dict[str, Any] = response.json()
+        await self._stream_diff(payload)
+        self._synced_at = time.monotonic()
+        self._schedule_save()
+        return self.snapshot
+
+    def is_fresh(self) -> bool:
+        """Снимок синхронизирован в пределах окна свежести"""
+        if self._synced_at is None or self.cache_ttl <= 0:
+            return False
+        return time.monotonic() - self._synced_at < self.cache_ttl
+
+    async def get_snapshot(self) -> DataSnapshot:
+        """Получение актуального снимка данных (один запрос на вызов)"""
+        if self.is_fresh() or _pinned_client.get() is self:
+            return self.snapshot
+        return await self.sync()
+
+    @contextmanager
+    def pinned(self) -> Iterator[None]:
+        """Внутри блока get_snapshot возвращает текущий снимок без синхронизации
+
+        Действует и на задачи, созданные внутри блока
+        """
+        token = _pinned_client.set(self)
+        try:
+            yield
+        finally:
+            _pinned_client.reset(token)
+
+    async def cached_call(
+        self,
+        name: str,
+        arguments: Dict[str, Any],
+        compute: Callable[[], Awaitable[T]],
+    ) -> T:
+        """Результат инструмента, кэшируемый до изменения данных
+
+        Ключ - инструмент, нормализованные аргументы и версия снимка.
+        Внутри compute снимок повторно не синхронизируется
+        """
+        snapshot = await self.get_snapshot()
+        version = snapshot.version
+        key = (name, normalize_arguments(arguments))
+        cached: Optional[T] = self.results.get(key, version)
+        if cached is not None:
+            return cached
+
+        with self.pinned():
+            result = await compute()
+
+        # Конкурентная синхронизация могла изменить снимок во время расчета
+        if self.snapshot.version == version:
+            self.results.put(key, version, result)
         return result
 
+    async def get_data(self) -> Dict[str, Any]:
+        """Получение всех данных через diff API"""
+        snapshot = await self.get_snapshot()
+        return snapshot.to_dict()
+
     async def get_transactions(self) -> List[Transaction]:
         """Получение всех транзакций"""
-        data = await self.get_data()
-        transactions = []
-
-        for t_data in data.get("transaction", []):
-            transactions.append(Transaction(**t_data))
-
-        return transactions
+        snapshot = await self.get_snapshot()
+        return snapshot.transactions
 
     async def get_categories(self) -> Dict[str, Category]:
         """Получение всех категорий"""
-        data = await self.get_data()
-        categories = {}
-
-        for c_data in data.get("tag", []):
-            categories[c_data["id"]] = Category(**c_data)
-
-        return categories
+        snapshot = await self.get_snapshot()
+        return snapshot.categories
 
     async def get_accounts(self) -> Dict[str, Account]:
         """Получение всех счетов"""
-        data = await self.get_data()
-        accounts = {}
-
-        for a_data in data.get("account", []):
-            accounts[a_data["id"]] = Account(**a_data)
-
-        return accounts
+        snapshot = await self.get_snapshot()
+        return snapshot.accounts
 
     async def update_transaction(
         self, transaction_id: str, updates: Dict[str, Any]
     ) -> bool:
         """Обновление транзакции"""
-        url = f"{self.base_url}/v8/diff/"
-
-        # Получаем текущие данные транзакции
-        data = await self.get_data()
-        transaction_data = None
-
-        for t_data in data.get("transaction", []):
-            if t_data["id"] == transaction_id:
-                transaction_data = t_data.copy()
-                break
-
-        if not transaction_data:
+        # Запись отправляется целиком, поэтому читаем ее после синхронизации,
+        # а не из кэша: иначе затрутся правки из других клиентов
+        snapshot = await self.sync()
+        current = snapshot.entities.get("transaction", {}).get(transaction_id)
+        if not current:
             return False
+        transaction_data = current.copy()
 
         # Применяем обновления
         transaction_data.update(updates)
         transaction_data["changed"] = int(datetime.now().timestamp())
 
-        payload = {
-            "serverTimestamp": data.get("serverTimestamp", 0),
+        payload: Dict[str, Any] = {
+            "serverTimestamp": snapshot.server_timestamp,
             "currentClientTimestamp": int(datetime.now().timestamp()),
             "transaction": [transaction_data],
         }
 
-        response = requests.post(url, json=payload, headers=self.headers)
-        response.raise_for_status()
+        # Ответ содержит все изменения с serverTimestamp, поэтому после него
+        # снимок снова считается свежим, а правка сразу видна в кэше.
+        # Запись сервера главнее локальной копии: своя применяется, только
+        # если сервер ее не вернул
+        received = await self._stream_diff(payload)
+        if ("transaction", transaction_id) not in received:
+            await self._apply({"transaction": [transaction_data]})
+        self._synced_at = time.monotonic()
+        self._schedule_save()
         return True
@@ -0,0 +1,54 @@
+"""
+Реестр клиентов ДзенМани на время жизни процесса
+"""
+
+from typing import Dict, Optional
+
+import httpx
+
+from src.client import ZenMoneyClient, create_http_session
+from src.storage import SnapshotFile, SQLiteStore
+
+
+class ClientRegistry:
+    """Клиенты по токену с общей HTTP-сессией
+
+    Клиент хранит снимок данных и производные индексы, поэтому
+    повторные вызовы инструментов с тем же токеном обслуживаются из памяти
+    """
+
+    def __init__(
+        self,
+        session: Optional[httpx.AsyncClient] = None,
+        cache_ttl: float = 0.0,
+        store: Optional[SQLiteStore] = None,
+        snapshot_file: Optional[SnapshotFile] = None,
+    ) -> None:
+        self.session = session or create_http_session()
+        self.cache_ttl = cache_ttl
+        self.store = store
+        self.snapshot_file = snapshot_file
+        self._clients: Dict[str, ZenMoneyClient] = {}
+
+    def get(self, token: str) -> ZenMoneyClient:
+        """Клиент для токена (создается при первом обращении)"""
+        client = self._clients.get(token)
+        if client is None:
+            client = ZenMoneyClient(
+                token,
+                session=self.session,
+                cache_ttl=self.cache_ttl,
+                store=self.store,
+                snapshot_file=self.snapshot_file,
+            )
+            self._clients[token] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Запись файлов снимков, закрытие общей HTTP-сессии и хранилища"""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+        await self.session.aclose()
+        if self.store is not None:
+            self.store.close()
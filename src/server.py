@@ -17,6 +17,8 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 try:
+    from src.registry import ClientRegistry
+    from src.storage import SnapshotFile, SQLiteStore
     from tools.data import DataTools
     from tools.reports import ReportsTools
 except ImportError:
@@ -25,13 +27,28 @@ except ImportError:
     sys.exit(1)
 
 
+# Окно свежести снимка данных по умолчанию, секунд
+DEFAULT_CACHE_TTL = 60.0
+
+
 class ZenMoneyMCPServer:
     """MCP сервер для работы с ДзенМани API"""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        cache_ttl: float = DEFAULT_CACHE_TTL,
+        db_path: Optional[str] = None,
+        snapshot_dir: Optional[str] = None,
+    ) -> None:
         self.server = Server("zenmoney-mcp")
-        self.data_tools = DataTools()
-        self.reports_tools = ReportsTools()
+        # Клиенты, HTTP-сессия и снимки данных живут весь процесс сервера
+        self.clients = ClientRegistry(
+            cache_ttl=cache_ttl,
+            store=SQLiteStore(db_path) if db_path else None,
+            snapshot_file=SnapshotFile(snapshot_dir) if snapshot_dir else None,
+        )
+        self.data_tools = DataTools(self.clients)
+        self.reports_tools = ReportsTools(self.clients)
         self.token: Optional[str] = None
 
     def register_tools(self) -> None:
@@ -65,10 +82,15 @@ class ZenMoneyMCPServer:
         """Запуск сервера"""
         self.register_tools()
 
-        async with stdio_server() as (read_stream, write_stream):
-            await self.server.run(
-                read_stream, write_stream, self.server.create_initialization_options()
-            )
+        try:
+            async with stdio_server() as (read_stream, write_stream):
+                await self.server.run(
+                    read_stream,
+                    write_stream,
+                    self.server.create_initialization_options(),
+                )
+        finally:
+            await self.clients.aclose()
 
 
 async def main() -> None:
@@ -78,12 +100,32 @@ async def main() -> None:
 
     parser = argparse.ArgumentParser(description="ZenMoney MCP Server")
     parser.add_argument("--token", help="ZenMoney Bearer token")
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=float(os.getenv("ZENMONEY_CACHE_TTL", DEFAULT_CACHE_TTL)),
+        help="Snapshot freshness window in seconds (0 disables caching)",
+    )
+    parser.add_argument(
+        "--db-path",
+        default=os.getenv("ZENMONEY_DB_PATH"),
+        help="SQLite file for the synced data (disabled if not set)",
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        default=os.getenv("ZENMONEY_SNAPSHOT_DIR"),
+        help="Directory for binary warm-start snapshots (disabled if not set)",
+    )
     args = parser.parse_args()
 
     # Получаем токен из аргументов или переменной окружения
     token: str = args.token or os.getenv("ZENMONEY_TOKEN") or ""
 
-    server = ZenMoneyMCPServer()
+    server = ZenMoneyMCPServer(
+        cache_ttl=args.cache_ttl,
+        db_path=args.db_path,
+        snapshot_dir=args.snapshot_dir,
+    )
 
     # Если токен передан, устанавливаем его сразу
     server.token = token
@@ -0,0 +1,409 @@
+"""
+Локальный снимок данных ДзенМани, синхронизируемый через diff API
+"""
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from models.account import Account
+from models.category import Category
+from models.transaction import (
+    OTHER,
+    Transaction,
+    TransactionFilter,
+    classify_rows,
+    record_row,
+)
+from utils.aggregation import Aggregation, aggregate_records
+from utils.categories import CategoryResolver
+from utils.filtering import filter_records
+from utils.frame import TransactionFrame
+from utils.indexing import DateIndex, TransactionIndexes
+
+# Ключи ответа diff API, которые не являются списками сущностей
+SERVICE_KEYS = ("serverTimestamp", "deletion")
+
+T = TypeVar("T")
+
+
+def entity_key(entity_type: str, record: Dict[str, Any]) -> str:
+    """Ключ сущности внутри снимка"""
+    if "id" in record:
+        return str(record["id"])
+    # У бюджетов нет собственного ID: они уникальны по категории и месяцу
+    return f"{record.get('tag')}:{record.get('date')}"
+
+
+class DataSnapshot:
+    """Снимок данных пользователя с инкрементальным применением diff"""
+
+    # Представления, сохраняемые в файл снимка вместе с сырыми данными,
+    # если к моменту записи они уже построены
+    PERSISTED_VIEWS = (
+        "kinds",
+        "date_index",
+        "frame",
+        "categories",
+        "accounts",
+    )
+
+    def __init__(self) -> None:
+        self.server_timestamp = 0
+        self.version = 0
+        self.entities: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # Есть изменения, еще не закрепленные commit
+        self._dirty = False
+        # Производные представления, действительные для текущей версии
+        self._cache: Dict[str, Any] = {}
+        # Модели транзакций по ID, переживают смену версии снимка
+        self._transaction_models: Dict[str, Transaction] = {}
+        # Хэш-индексы транзакций, обновляются по одной записи
+        self._indexes: Optional[TransactionIndexes] = None
+        # Сводки по месяцам YYYY-MM, сбрасываются только для измененных месяцев
+        self._rollups: Dict[str, Aggregation] = {}
+
+    def apply_diff(self, diff: Dict[str, Any]) -> bool:
+        """Применение ответа diff API к снимку
+
+        Возвращает True, если данные снимка изменились
+        """
+        for entity_type, records in diff.items():
+            if entity_type in SERVICE_KEYS or not isinstance(records, list):
+                continue
+            for record in records:
+                self.apply_record(entity_type, record)
+
+        for deletion in diff.get("deletion", []):
+            self.apply_deletion(deletion)
+
+        return self.commit(diff.get("serverTimestamp") or 0)
+
+    def apply_record(self, entity_type: str, record: Dict[str, Any]) -> None:
+        """Добавление или замена одной сущности"""
+        key = entity_key(entity_type, record)
+        records = self.entities.setdefault(entity_type, {})
+        self._reindex(entity_type, key, records.get(key), record)
+        self._forget_rollups(entity_type, records.get(key), record)
+        records[key] = record
+        self._forget_model(entity_type, key)
+        self._dirty = True
+        self._cache.clear()
+
+    def apply_deletion(self, deletion: Dict[str, Any]) -> None:
+        """Удаление сущности по записи из списка deletion"""
+        entity_type = deletion.get("object", "")
+        key = str(deletion.get("id"))
+        removed = self.entities.get(entity_type, {}).pop(key, None)
+        if removed is not None:
+            self._reindex(entity_type, key, removed, None)
+            self._forget_rollups(entity_type, removed, None)
+            self._forget_model(entity_type, key)
+            self._dirty = True
+            self._cache.clear()
+
+    def commit(self, server_timestamp: int) -> bool:
+        """Завершение применения diff: новый serverTimestamp и версия
+
+        Возвращает True, если с прошлого commit данные изменились
+        """
+        self.server_timestamp = max(self.server_timestamp, server_timestamp)
+        changed = self._dirty
+        if changed:
+            self.version += 1
+            self._dirty = False
+            self._cache.clear()
+        return changed
+
+    def _forget_model(self, entity_type: str, key: str) -> None:
+        if entity_type == "transaction":
+            self._transaction_models.pop(key, None)
+
+    def _reindex(
+        self,
+        entity_type: str,
+        key: str,
+        old: Optional[Dict[str, Any]],
+        new: Optional[Dict[str, Any]],
+    ) -> None:
+        if entity_type != "transaction" or self._indexes is None:
+            return
+        if old is not None:
+            self._indexes.remove(key, old)
+        if new is not None:
+            self._indexes.add(key, new)
+
+    def _forget_rollups(
+        self,
+        entity_type: str,
+        old: Optional[Dict[str, Any]],
+        new: Optional[Dict[str, Any]],
+    ) -> None:
+        if entity_type == "transaction":
+            # Парные переводы всегда в один день, поэтому изменение транзакции
+            # влияет только на сводки ее месяцев
+            for record in (old, new):
+                if record is not None:
+                    self._rollups.pop(record["date"][:7], None)
+        elif entity_type == "tag":
+            # Сводки сгруппированы по названиям категорий
+            self._rollups.clear()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_cache"] = {
+            key: value
+            for key, value in self._cache.items()
+            if key in self.PERSISTED_VIEWS
+        }
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        # Атрибуты, появившиеся после записи файла, получают значения по умолчанию
+        self.__init__()  # type: ignore[misc]
+        self.__dict__.update(state)
+
+    def frozen_copy(self) -> "DataSnapshot":
+        """Копия снимка для сериализации вне цикла событий
+
+        Копируются только словари, которые меняются при чтении и применении
+        diff. Записи и представления текущей версии общие: они не изменяются
+        на месте. Хэш-индексы тоже общие, поэтому, пока копия сериализуется,
+        diff к снимку не применяется
+        """
+        copy = DataSnapshot.__new__(DataSnapshot)
+        copy.__dict__.update(self.__getstate__())
+        copy.entities = {
+            entity_type: dict(records) for entity_type, records in self.entities.items()
+        }
+        copy._transaction_models = dict(self._transaction_models)
+        copy._rollups = dict(self._rollups)
+        return copy
+
+    def _cached(self, key: str, factory: Callable[[], T]) -> T:
+        """Производное представление, пересчитываемое при смене версии"""
+        if key not in self._cache:
+            self._cache[key] = factory()
+        value: T = self._cache[key]
+        return value
+
+    def _transaction_model(self, key: str, record: Dict[str, Any]) -> Transaction:
+        model = self._transaction_models.get(key)
+        if model is None:
+            model = Transaction(**record)
+            self._transaction_models[key] = model
+        return model
+
+    @property
+    def transactions(self) -> List[Transaction]:
+        """Все транзакции снимка (модели строятся только для измененных)"""
+        return self._cached(
+            "transactions",
+            lambda: [
+                self._transaction_model(key, record)
+                for key, record in self.entities.get("transaction", {}).items()
+            ],
+        )
+
+    @property
+    def kinds(self) -> Dict[str, str]:
+        """Тип каждой транзакции по ID (INCOME, EXPENSE, TRANSFER, OTHER)
+
+        Считается по сырым записям один раз на версию снимка
+        """
+        return self._cached(
+            "kinds",
+            lambda: classify_rows(map(record_row, self.records("transaction"))),
+        )
+
+    def kind_of(self, transaction: Transaction) -> str:
+        """Тип транзакции снимка"""
+        return self.kinds.get(transaction.id, OTHER)
+
+    @property
+    def date_index(self) -> DateIndex:
+        """Транзакции, отсортированные по дате"""
+        return self._cached(
+            "date_index",
+            lambda: DateIndex(
+                (key, record["date"])
+                for key, record in self.entities.get("transaction", {}).items()
+            ),
+        )
+
+    @property
+    def indexes(self) -> TransactionIndexes:
+        """Хэш-индексы транзакций по категориям, счетам, получателям и торговцам
+
+        Строятся один раз, дальше поддерживаются при применении diff
+        """
+        if self._indexes is None:
+            self._indexes = TransactionIndexes.build(
+                self.entities.get("transaction", {}).items()
+            )
+        return self._indexes
+
+    def get_transaction(self, transaction_id: str) -> Optional[Transaction]:
+        """Транзакция по ID"""
+        record = self.entities.get("transaction", {}).get(transaction_id)
+        if record is None:
+            return None
+        return self._transaction_model(transaction_id, record)
+
+    def select_transactions(
+        self,
+        filter_params: TransactionFilter,
+        keys: Optional[Iterable[str]] = None,
+    ) -> List[Transaction]:
+        """Транзакции, подходящие под фильтр, в порядке дат
+
+        keys - заранее отобранные по индексам кандидаты. Без них период
+        выбирается бинарным поиском по индексу дат, а фильтр по категориям
+        берет кандидатов из хэш-индекса. Остальные условия применяются
+        к сырым записям, и модели строятся только для прошедших фильтр
+        """
+        return list(self.iter_transactions(filter_params, keys))
+
+    def iter_transactions(
+        self,
+        filter_params: TransactionFilter,
+        keys: Optional[Iterable[str]] = None,
+        newest_first: bool = False,
+    ) -> Iterator[Transaction]:
+        """Ленивая выборка транзакций (см. select_transactions)
+
+        Записи фильтруются и модели строятся по мере чтения, поэтому
+        остановка после первых N транзакций не затрагивает остальные
+        """
+        for key, record in self.select_records(filter_params, keys, newest_first):
+            yield self._transaction_model(key, record)
+
+    def select_records(
+        self,
+        filter_params: TransactionFilter,
+        keys: Optional[Iterable[str]] = None,
+        newest_first: bool = False,
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Сырые записи транзакций, подходящих под фильтр, в порядке дат
+
+        newest_first - от новых к старым
+        """
+        records = self.entities.get("transaction", {})
+        if keys is None and filter_params.category_ids:
+            keys = self.indexes.lookup(
+                self.indexes.by_category, filter_params.category_ids
+            )
+
+        ordered: Iterable[str]
+        if keys is None:
+            # Обход позиций индекса дат без копирования среза
+            index_keys = self.date_index.keys
+            start, end = self.date_index.select_positions(filter_params)
+            positions = (
+                range(end - 1, start - 1, -1) if newest_first else range(start, end)
+            )
+            ordered = (index_keys[i] for i in positions)
+            dates_checked = True
+        else:
+            matching = sorted(
+                (key for key in keys if key in records),
+                key=lambda key: records[key]["date"],
+            )
+            ordered = reversed(matching) if newest_first else matching
+            dates_checked = False
+
+        candidates = ((key, records[key]) for key in ordered)
+        return filter_records(candidates, filter_params, dates_checked=dates_checked)
+
+    @property
+    def frame(self) -> TransactionFrame:
+        """Колоночное представление транзакций в порядке индекса дат"""
+        return self._cached(
+            "frame",
+            lambda: TransactionFrame.build(
+                self.date_index.keys,
+                self.entities.get("transaction", {}),
+                self.kinds,
+                self.category_resolver,
+            ),
+        )
+
+    def summarize(self, filter_params: TransactionFilter) -> Aggregation:
+        """Сводка по транзакциям, подходящим под фильтр
+
+        Фильтр только по датам сводится к срезу колонок, остальные
+        считаются по сырым записям. Модели транзакций не строятся
+        """
+        if filter_params.category_ids or filter_params.uncategorized_only:
+            return aggregate_records(
+                (record for _, record in self.select_records(filter_params)),
+                self.kinds,
+                self.category_resolver,
+            )
+        start, end = self.date_index.select_positions(filter_params)
+        return self.frame.aggregate(start, end)
+
+    def month_summary(self, month: str) -> Aggregation:
+        """Сводка за месяц YYYY-MM, хранится до изменения его транзакций"""
+        summary = self._rollups.get(month)
+        if summary is None:
+            records = self.entities.get("transaction", {})
+            keys = self.date_index.range(month, month + "\uffff")
+            rows = [records[key] for key in keys]
+            # Переводы ищутся среди операций того же дня, поэтому типы
+            # можно определить только по записям этого месяца
+            kinds = classify_rows(map(record_row, rows))
+            summary = aggregate_records(rows, kinds, self.category_resolver)
+            self._rollups[month] = summary
+        return summary
+
+    def summarize_months(self, months: Iterable[str]) -> Aggregation:
+        """Сводка за несколько месяцев из помесячных сводок"""
+        result = Aggregation()
+        for month in months:
+            result.merge(self.month_summary(month))
+        return result
+
+    @property
+    def categories(self) -> Dict[str, Category]:
+        """Категории (теги) снимка по ID"""
+        return self._cached(
+            "categories",
+            lambda: {c["id"]: Category(**c) for c in self.records("tag")},
+        )
+
+    @property
+    def category_resolver(self) -> CategoryResolver:
+        """Справочник категорий: названия, корневые и вложенные категории"""
+        return self._cached(
+            "category_resolver", lambda: CategoryResolver(self.categories)
+        )
+
+    @property
+    def accounts(self) -> Dict[str, Account]:
+        """Счета снимка по ID"""
+        return self._cached(
+            "accounts",
+            lambda: {a["id"]: Account(**a) for a in self.records("account")},
+        )
+
+    def records(self, entity_type: str) -> List[Dict[str, Any]]:
+        """Список сырых записей сущности"""
+        return list(self.entities.get(entity_type, {}).values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Снимок в формате ответа diff API"""
+        result: Dict[str, Any] = {
+            entity_type: list(records.values())
+            for entity_type, records in self.entities.items()
+        }
+        result["serverTimestamp"] = self.server_timestamp
+        return result
@@ -0,0 +1,199 @@
+"""
+Локальное хранилище синхронизированных данных
+"""
+
+import json
+import os
+import pickle
+import sqlite3
+import stat
+import tempfile
+import threading
+from typing import Any, Dict, Optional, Union
+
+from src.snapshot import SERVICE_KEYS, DataSnapshot, entity_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entity (
+    owner TEXT NOT NULL,
+    type TEXT NOT NULL,
+    id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (owner, type, id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    owner TEXT PRIMARY KEY,
+    server_timestamp INTEGER NOT NULL
+);
+"""
+
+
+class SQLiteStore:
+    """Хранилище сущностей diff API и serverTimestamp в SQLite
+
+    Данные разных пользователей разделяются ключом владельца,
+    сам токен в базе не хранится
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = os.path.expanduser(path)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Запросы выполняются из пула потоков, доступ сериализуется блокировкой
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def load(self, owner: str) -> Optional[Dict[str, Any]]:
+        """Сохраненные данные в формате ответа diff API"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT server_timestamp FROM sync_state WHERE owner = ?", (owner,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            result: Dict[str, Any] = {"serverTimestamp": row[0]}
+            rows = self._conn.execute(
+                "SELECT type, data FROM entity WHERE owner = ?", (owner,)
+            )
+            for entity_type, data in rows:
+                result.setdefault(entity_type, []).append(json.loads(data))
+            return result
+
+    def server_timestamp(self, owner: str) -> Optional[int]:
+        """Сохраненный serverTimestamp (None - данных пользователя нет)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT server_timestamp FROM sync_state WHERE owner = ?", (owner,)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def replace(self, owner: str, data: Dict[str, Any], server_timestamp: int) -> None:
+        """Замена всех данных пользователя полной выгрузкой"""
+        self.save_diff(owner, data, server_timestamp, replace=True)
+
+    def save_diff(
+        self,
+        owner: str,
+        diff: Dict[str, Any],
+        server_timestamp: int,
+        replace: bool = False,
+    ) -> None:
+        """Сохранение изменений из diff и нового serverTimestamp
+
+        replace - прежние данные пользователя удаляются в той же транзакции
+        """
+        upserts = [
+            (owner, entity_type, entity_key(entity_type, record), json.dumps(record))
+            for entity_type, records in diff.items()
+            if entity_type not in SERVICE_KEYS and isinstance(records, list)
+            for record in records
+        ]
+        deletions = [
+            (owner, deletion.get("object", ""), str(deletion.get("id")))
+            for deletion in diff.get("deletion", [])
+        ]
+
+        with self._lock, self._conn:
+            if replace:
+                self._conn.execute("DELETE FROM entity WHERE owner = ?", (owner,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entity (owner, type, id, data) "
+                "VALUES (?, ?, ?, ?)",
+                upserts,
+            )
+            self._conn.executemany(
+                "DELETE FROM entity WHERE owner = ? AND type = ? AND id = ?",
+                deletions,
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (owner, server_timestamp) "
+                "VALUES (?, ?)",
+                (owner, server_timestamp),
+            )
+
+    def close(self) -> None:
+        """Закрытие соединения с базой"""
+        with self._lock:
+            self._conn.close()
+
+
+class SnapshotFile:
+    """Бинарные файлы снимков для быстрого старта сервера
+
+    Снимок сохраняется вместе с уже построенными представлениями, поэтому
+    после перезапуска не нужно заново разбирать JSON и строить индексы.
+    Файл читается через pickle, а это позволяет выполнить произвольный код:
+    каталог и файлы должны принадлежать пользователю сервера и не быть
+    доступны на запись другим. Файлы, нарушающие это, не загружаются
+    """
+
+    MAGIC = b"ZMSNAP"
+    # Версия формата: увеличивается при любом изменении сохраняемых классов
+    # (DataSnapshot, модели, индексы, TransactionFrame, Aggregation)
+    FORMAT_VERSION = 2
+
+    def __init__(self, directory: str) -> None:
+        self.directory = os.path.expanduser(directory)
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+
+    @classmethod
+    def header(cls) -> bytes:
+        """Заголовок файла с версией формата"""
+        return cls.MAGIC + str(cls.FORMAT_VERSION).encode() + b"\n"
+
+    def path_for(self, owner: str) -> str:
+        """Путь к файлу снимка пользователя"""
+        return os.path.join(self.directory, f"{owner}.snapshot")
+
+    @classmethod
+    def dumps(cls, snapshot: DataSnapshot) -> bytes:
+        """Сериализация снимка вместе с уже построенными представлениями"""
+        return cls.header() + pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self, owner: str) -> Optional[DataSnapshot]:
+        """Загрузка снимка (None, если файла нет, он устарел или небезопасен)"""
+        path = self.path_for(owner)
+        try:
+            with open(path, "rb") as f:
+                if not (is_private(self.directory) and is_private(f.fileno())):
+                    return None
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        header = self.header()
+        if not data.startswith(header):
+            return None
+        try:
+            snapshot = pickle.loads(data[len(header) :])
+        except Exception:
+            return None
+        return snapshot if isinstance(snapshot, DataSnapshot) else None
+
+    def save(self, owner: str, data: bytes) -> None:
+        """Атомарная запись сериализованного снимка"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path_for(owner))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def is_private(path: Union[str, int]) -> bool:
+    """Файл или каталог принадлежит текущему пользователю и закрыт
+    на запись для остальных"""
+    if not hasattr(os, "getuid"):
+        # В Windows права задаются ACL, а не битами режима
+        return True
+    info = os.stat(path)
+    if info.st_uid != os.getuid():
+        return False
+    return not info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
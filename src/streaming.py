@@ -0,0 +1,125 @@
+"""
+Потоковый разбор ответа diff API
+"""
+
+import json
+from typing import Any, Dict, List, Tuple
+
+_WHITESPACE = " \t\n\r"
+# Символы, которые могут следовать за числом или литералом
+_DELIMITERS = _WHITESPACE + ",]}"
+
+# Состояния разбора верхнеуровневого объекта ответа
+_START, _KEY, _COLON, _VALUE, _ITEM, _END = range(6)
+
+
+class DiffStreamParser:
+    """Инкрементальный разбор ответа diff API по чанкам
+
+    Ответ - объект, значения которого в основном массивы сущностей.
+    Каждый элемент массива отдается как событие (ключ, запись) сразу после
+    того, как он полностью пришел, а разобранная часть текста отбрасывается.
+    Скалярные значения верхнего уровня (serverTimestamp) собираются в scalars
+    """
+
+    def __init__(self) -> None:
+        self.scalars: Dict[str, Any] = {}
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _START
+        self._key = ""
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Разбор очередного чанка, возвращает готовые элементы массивов"""
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        events: List[Tuple[str, Any]] = []
+        while self._step(events):
+            pass
+        return events
+
+    def close(self) -> None:
+        """Проверка, что ответ получен полностью"""
+        if self._state != _END:
+            raise ValueError("Ответ diff API получен не полностью")
+
+    def _step(self, events: List[Tuple[str, Any]]) -> bool:
+        """Один шаг разбора; False, если нужны следующие данные"""
+        if not self._skip_whitespace() or self._state == _END:
+            return False
+
+        char = self._buffer[self._pos]
+        state = self._state
+
+        if state == _START:
+            self._expect(char, "{")
+            self._state = _KEY
+        elif state == _KEY:
+            if char == "}":
+                self._pos += 1
+                self._state = _END
+            elif char == ",":
+                self._pos += 1
+            else:
+                self._expect(char, '"', advance=False)
+                complete, key = self._decode()
+                if not complete:
+                    return False
+                self._key = key
+                self._state = _COLON
+        elif state == _COLON:
+            self._expect(char, ":")
+            self._state = _VALUE
+        elif state == _VALUE:
+            if char == "[":
+                self._pos += 1
+                self._state = _ITEM
+            else:
+                complete, value = self._decode()
+                if not complete:
+                    return False
+                self.scalars[self._key] = value
+                self._state = _KEY
+        elif state == _ITEM:
+            if char == "]":
+                self._pos += 1
+                self._state = _KEY
+            elif char == ",":
+                self._pos += 1
+            else:
+                complete, item = self._decode()
+                if not complete:
+                    return False
+                events.append((self._key, item))
+        return True
+
+    def _skip_whitespace(self) -> bool:
+        buffer, pos = self._buffer, self._pos
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return pos < len(buffer)
+
+    def _expect(self, char: str, expected: str, advance: bool = True) -> None:
+        if char != expected:
+            raise ValueError(
+                f"Некорректный ответ diff API: ожидался '{expected}', получен '{char}'"
+            )
+        if advance:
+            self._pos += 1
+
+    def _decode(self) -> Tuple[bool, Any]:
+        """Разбор значения с текущей позиции, если оно пришло целиком"""
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            return False, None
+        # Число или литерал могли быть обрезаны границей чанка (в том числе
+        # после "." или "e"): они закончены, только если дальше идет разделитель
+        if self._buffer[self._pos] not in '{["' and (
+            end == len(self._buffer) or self._buffer[end] not in _DELIMITERS
+        ):
+            return False, None
+        self._pos = end
+        return True, value
@@ -2,11 +2,62 @@
 Базовые фикстуры для тестов
 """
 
-from unittest.mock import Mock
+import json
+from typing import Optional
+from unittest.mock import AsyncMock, Mock
 
+import httpx
 import pytest
 
 from models.transaction import Transaction
+from src.client import ZenMoneyClient
+from src.snapshot import DataSnapshot
+from src.storage import SnapshotFile, SQLiteStore
+
+
+def make_diff(server_timestamp, **entities):
+    """Ответ diff API с заданными сущностями"""
+    return {"serverTimestamp": server_timestamp, **entities}
+
+
+def snapshot_client(**entities) -> Mock:
+    """Заглушка клиента, отдающая снимок с заданными сущностями
+
+    Сам снимок доступен как client.snapshot
+    """
+    snapshot = DataSnapshot()
+    snapshot.apply_diff(make_diff(100, **entities))
+    client = Mock(spec=ZenMoneyClient)
+    client.snapshot = snapshot
+    client.get_snapshot = AsyncMock(return_value=snapshot)
+    return client
+
+
+class FakeDiffAPI:
+    """Подмена diff API, отвечающая заранее заданными ответами"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(json.loads(request.content))
+        return httpx.Response(200, json=self.responses.pop(0))
+
+    def client(
+        self,
+        cache_ttl: float = 0.0,
+        store: Optional[SQLiteStore] = None,
+        snapshot_file: Optional[SnapshotFile] = None,
+    ) -> ZenMoneyClient:
+        session = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        return ZenMoneyClient(
+            "token",
+            session=session,
+            cache_ttl=cache_ttl,
+            store=store,
+            snapshot_file=snapshot_file,
+        )
 
 
 @pytest.fixture
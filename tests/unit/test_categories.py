@@ -0,0 +1,108 @@
+"""
+Тесты для справочника категорий
+"""
+
+import asyncio
+
+from data_tools.transactions import TransactionsTool
+from models.category import Category
+from models.transaction import Transaction
+from tests.fixtures import snapshot_client
+from utils.categories import UNCATEGORIZED, CategoryResolver
+
+CATEGORIES = {
+    "food": Category(id="food", title="Еда"),
+    "cafe": Category(id="cafe", title="Кафе", parent="food"),
+    "coffee": Category(id="coffee", title="Кофейни", parent="cafe"),
+    "taxi": Category(id="taxi", title="Такси"),
+}
+
+
+class TestCategoryResolver:
+    """Тесты разрешения категорий"""
+
+    def test_hierarchy(self):
+        """Тест корневых и вложенных категорий"""
+        resolver = CategoryResolver(CATEGORIES)
+
+        assert resolver.roots["coffee"] == "food"
+        assert resolver.roots["taxi"] == "taxi"
+        assert resolver.descendants["food"] == {"cafe", "coffee"}
+        assert resolver.with_descendants(["cafe"]) == {"cafe", "coffee"}
+
+    def test_resolve_by_id_or_title(self):
+        """Тест поиска категории по ID и названию без учета регистра"""
+        resolver = CategoryResolver(CATEGORIES)
+
+        assert resolver.resolve("taxi") == ["taxi"]
+        assert resolver.resolve("кафе") == ["cafe"]
+        assert resolver.resolve("Нет такой") == []
+
+    def test_name_falls_back_to_tag(self):
+        """Тест определения категории по первому тегу"""
+        resolver = CategoryResolver(CATEGORIES)
+
+        by_tag = Transaction(id="t1", date="2025-01-01", tag=["taxi"])
+        unknown = Transaction(id="t2", date="2025-01-01", category="missing")
+
+        assert resolver.name_of(by_tag) == "Такси"
+        assert resolver.name_of(unknown) == UNCATEGORIZED
+
+    def test_parent_cycle(self):
+        """Тест защиты от циклов в иерархии"""
+        resolver = CategoryResolver(
+            {
+                "a": Category(id="a", title="A", parent="b"),
+                "b": Category(id="b", title="B", parent="a"),
+            }
+        )
+
+        assert resolver.roots["a"] in ("a", "b")
+        assert resolver.descendants["a"] == {"b"}
+
+
+class TestTransactionsCategoryFilter:
+    """Тесты фильтра транзакций по категориям"""
+
+    def _run(self, args):
+        client = snapshot_client(
+            tag=[c.model_dump() for c in CATEGORIES.values()],
+            transaction=[
+                {"id": "t1", "date": "2025-01-01", "outcome": 10, "tag": ["food"]},
+                {"id": "t2", "date": "2025-01-02", "outcome": 20, "tag": ["coffee"]},
+                {"id": "t3", "date": "2025-01-03", "outcome": 30, "tag": ["taxi"]},
+                {"id": "t4", "date": "2025-01-04", "outcome": 40},
+            ],
+        )
+        result = asyncio.run(TransactionsTool().execute(client, args))
+        return result.content[0].text
+
+    def test_parent_includes_children(self):
+        """Тест фильтра по родительской категории"""
+        text = self._run({"category": ["Еда"], "show_ids": True})
+
+        assert "t1" in text and "t2" in text
+        assert "t3" not in text and "t4" not in text
+
+    def test_uncategorized_by_name(self):
+        """Тест фильтра транзакций без категории"""
+        text = self._run({"category": [UNCATEGORIZED], "show_ids": True})
+
+        assert "t4" in text
+        assert "t1" not in text
+
+    def test_latest_first_with_limit(self):
+        """Тест вывода последних транзакций с лимитом"""
+        text = self._run({"limit": 2, "show_ids": True})
+
+        assert text.index("t4") < text.index("t3")
+        assert "t1" not in text and "t2" not in text
+        assert "есть еще" in text
+
+    def test_limit_tolerates_null_and_negative(self):
+        """Тест лимита null и отрицательного лимита"""
+        text = self._run({"limit": None, "show_ids": True})
+        assert "Найдено транзакций: 4" in text
+
+        text = self._run({"limit": -1})
+        assert "Показано транзакций: 0" in text
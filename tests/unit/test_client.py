@@ -0,0 +1,205 @@
+"""
+Тесты для API клиента ДзенМани
+"""
+
+import asyncio
+
+from src.registry import ClientRegistry
+from tests.fixtures import FakeDiffAPI, make_diff
+from utils.caching import ResultCache, normalize_arguments
+
+
+class TestClientSync:
+    """Тесты синхронизации клиента"""
+
+    def test_sync_sends_last_server_timestamp(self):
+        """Тест отправки сохраненного serverTimestamp"""
+        api = FakeDiffAPI(
+            make_diff(100, transaction=[{"id": "t1", "date": "2025-01-01"}]),
+            make_diff(200, transaction=[{"id": "t2", "date": "2025-01-02"}]),
+        )
+        client = api.client()
+
+        async def run_test():
+            await client.get_data()
+            return await client.get_data()
+
+        data = asyncio.run(run_test())
+
+        assert [r["serverTimestamp"] for r in api.requests] == [0, 100]
+        assert {t["id"] for t in data["transaction"]} == {"t1", "t2"}
+
+    def test_update_transaction_patches_snapshot(self):
+        """Тест применения ответа на обновление к снимку"""
+        original = {"id": "t1", "date": "2025-01-01", "comment": None}
+        updated = {**original, "comment": "Обед"}
+        api = FakeDiffAPI(
+            make_diff(100, transaction=[original]),
+            make_diff(110, transaction=[updated]),
+        )
+        client = api.client()
+
+        success = asyncio.run(client.update_transaction("t1", {"comment": "Обед"}))
+
+        assert success is True
+        assert api.requests[1]["transaction"][0]["comment"] == "Обед"
+        assert client.snapshot.entities["transaction"]["t1"]["comment"] == "Обед"
+
+    def test_update_keeps_server_record(self):
+        """Тест приоритета записи сервера над локальной копией"""
+        original = {"id": "t1", "date": "2025-01-01", "comment": None}
+        server = {**original, "comment": "Обед", "changed": 1735689600}
+        api = FakeDiffAPI(
+            make_diff(100, transaction=[original]),
+            make_diff(110, transaction=[server]),
+        )
+        client = api.client()
+
+        async def run_test():
+            await client.update_transaction("t1", {"comment": "Обед"})
+            return client.snapshot
+
+        snapshot = asyncio.run(run_test())
+
+        assert snapshot.entities["transaction"]["t1"] == server
+        # Одна версия на синхронизацию и одна на правку
+        assert snapshot.version == 2
+
+    def test_concurrent_syncs_share_one_request(self):
+        """Тест объединения конкурентных запросов в один"""
+        api = FakeDiffAPI(
+            make_diff(100, transaction=[{"id": "t1", "date": "2025-01-01"}])
+        )
+        client = api.client()
+
+        async def run_test():
+            return await asyncio.gather(*(client.get_snapshot() for _ in range(3)))
+
+        snapshots = asyncio.run(run_test())
+
+        assert len(api.requests) == 1
+        assert all(s is client.snapshot for s in snapshots)
+
+
+class TestSnapshotCache:
+    """Тесты окна свежести снимка"""
+
+    def test_fresh_snapshot_reused(self):
+        """Тест повторного чтения без запроса к API"""
+        api = FakeDiffAPI(
+            make_diff(100, transaction=[{"id": "t1", "date": "2025-01-01"}])
+        )
+        client = api.client(cache_ttl=60)
+
+        async def run_test():
+            await client.get_snapshot()
+            await client.get_snapshot()
+
+        asyncio.run(run_test())
+
+        assert len(api.requests) == 1
+
+    def test_update_writes_through_cache(self):
+        """Тест видимости правки без повторной загрузки"""
+        original = {"id": "t1", "date": "2025-01-01", "payee": "Магазин"}
+        api = FakeDiffAPI(make_diff(100, transaction=[original]), make_diff(110))
+        client = api.client(cache_ttl=60)
+
+        async def run_test():
+            await client.update_transaction("t1", {"payee": "Пекарня"})
+            return await client.get_snapshot()
+
+        snapshot = asyncio.run(run_test())
+
+        assert len(api.requests) == 2
+        assert snapshot.transactions[0].payee == "Пекарня"
+
+    def test_update_reads_fresh_record(self):
+        """Тест синхронизации перед правкой внутри окна свежести"""
+        original = {"id": "t1", "date": "2025-01-01", "payee": "Магазин"}
+        remote = {**original, "comment": "Из приложения"}
+        api = FakeDiffAPI(
+            make_diff(100, transaction=[original]),
+            make_diff(105, transaction=[remote]),
+            make_diff(110),
+        )
+        client = api.client(cache_ttl=60)
+
+        async def run_test():
+            await client.get_snapshot()
+            return await client.update_transaction("t1", {"payee": "Пекарня"})
+
+        success = asyncio.run(run_test())
+
+        assert success is True
+        assert [r["serverTimestamp"] for r in api.requests] == [0, 100, 105]
+        sent = api.requests[2]["transaction"][0]
+        assert sent["payee"] == "Пекарня"
+        assert sent["comment"] == "Из приложения"
+
+
+class TestClientRegistry:
+    """Тесты реестра клиентов"""
+
+    def test_same_client_for_same_token(self):
+        """Тест переиспользования клиента и снимка между вызовами"""
+        registry = ClientRegistry()
+
+        client = registry.get("token-a")
+        assert registry.get("token-a") is client
+        assert registry.get("token-b") is not client
+        assert registry.get("token-b").session is client.session
+
+        asyncio.run(registry.aclose())
+
+
+class TestResultCache:
+    """Тесты кэша результатов инструментов"""
+
+    def test_repeated_call_served_from_cache(self):
+        """Тест повторного вызова с теми же аргументами"""
+        api = FakeDiffAPI(
+            make_diff(100, transaction=[{"id": "t1", "date": "2025-01-01"}]),
+            make_diff(110),
+            make_diff(120, transaction=[{"id": "t2", "date": "2025-01-02"}]),
+            make_diff(130),
+        )
+        client = api.client()
+        calls = []
+
+        async def compute():
+            snapshot = await client.get_snapshot()
+            calls.append(snapshot.version)
+            return len(snapshot.transactions)
+
+        async def run_test():
+            first = await client.cached_call("tool", {"a": 1, "b": None}, compute)
+            second = await client.cached_call("tool", {"a": 1}, compute)
+            third = await client.cached_call("tool", {"a": 1}, compute)
+            return first, second, third
+
+        results = asyncio.run(run_test())
+
+        # Внутри compute снимок повторно не синхронизируется
+        assert len(api.requests) == 3
+        assert results == (1, 1, 2)
+        assert calls == [1, 2]
+
+    def test_lru_eviction(self):
+        """Тест вытеснения давно не использованных результатов"""
+        cache = ResultCache(maxsize=2)
+        cache.put(("a", "{}"), 1, "A")
+        cache.put(("b", "{}"), 1, "B")
+        cache.get(("a", "{}"), 1)
+        cache.put(("c", "{}"), 1, "C")
+
+        assert cache.get(("a", "{}"), 1) == "A"
+        assert cache.get(("b", "{}"), 1) is None
+        assert cache.get(("a", "{}"), 2) is None
+        assert len(cache) == 0
+
+    def test_normalize_arguments(self):
+        """Тест нормализации аргументов"""
+        assert normalize_arguments({"b": 2, "a": None, "c": 1}) == normalize_arguments(
+            {"c": 1, "b": 2}
+        )
@@ -0,0 +1,139 @@
+"""
+Тесты для поиска дублей транзакций
+"""
+
+import asyncio
+import random
+
+from data_tools.duplicates import DuplicatesTool
+from models.transaction import Transaction
+from tests.fixtures import snapshot_client
+from utils.filtering import find_duplicates
+
+
+def _pairwise_duplicates(transactions):
+    """Перебор всех пар (прежняя реализация) для сравнения"""
+    duplicates = []
+    processed = set()
+    for i, t1 in enumerate(transactions):
+        if i in processed:
+            continue
+        group = [t1]
+        for j, t2 in enumerate(transactions[i + 1 :], i + 1):
+            if (
+                t1.date == t2.date
+                and abs(t1.amount - t2.amount) < 0.01
+                and t1.payee == t2.payee
+            ):
+                group.append(t2)
+                processed.add(j)
+        if len(group) > 1:
+            duplicates.append(group)
+    return duplicates
+
+
+def _keyed(records):
+    return [(record["id"], record) for record in records]
+
+
+class TestFindDuplicates:
+    """Тесты поиска дублей"""
+
+    def test_matches_pairwise_scan(self):
+        """Тест совпадения с попарным сравнением"""
+        rng = random.Random(24)
+        records = [
+            {
+                "id": f"t{i}",
+                "date": f"2025-01-{rng.randint(1, 5):02d}",
+                "outcome": rng.choice([100, 250.5, 999.99]),
+                "payee": rng.choice([None, "Кафе", "Такси"]),
+            }
+            for i in range(300)
+        ]
+
+        groups = find_duplicates(_keyed(records))
+
+        expected = _pairwise_duplicates([Transaction(**r) for r in records])
+        assert groups == [[t.id for t in g] for g in expected]
+
+    def test_payee_normalized(self):
+        """Тест сравнения получателей без учета регистра и пробелов"""
+        records = [
+            {"id": "t1", "date": "2025-01-01", "outcome": 100, "payee": "Кафе"},
+            {"id": "t2", "date": "2025-01-01", "outcome": 100, "payee": " КАФЕ "},
+        ]
+
+        assert find_duplicates(_keyed(records)) == [["t1", "t2"]]
+
+    def test_time_window(self):
+        """Тест поиска дублей в пределах нескольких дней"""
+        records = [
+            {"id": "t1", "date": "2025-01-01", "outcome": 100, "payee": "Кафе"},
+            {"id": "t2", "date": "2025-01-02", "outcome": 100, "payee": "Кафе"},
+            {"id": "t3", "date": "2025-01-10", "outcome": 100, "payee": "Кафе"},
+        ]
+
+        assert find_duplicates(_keyed(records)) == []
+        assert find_duplicates(_keyed(records), window_days=1) == [["t1", "t2"]]
+
+
+class TestDuplicatesTool:
+    """Тесты инструмента поиска дублей"""
+
+    def test_reports_groups(self):
+        """Тест вывода групп дублей за период"""
+        client = snapshot_client(
+            transaction=[
+                {"id": "t1", "date": "2025-01-01", "outcome": 100, "payee": "A"},
+                {"id": "t2", "date": "2025-01-01", "outcome": 100, "payee": "A"},
+                {"id": "t3", "date": "2024-01-01", "outcome": 100, "payee": "A"},
+                {"id": "t4", "date": "2024-01-01", "outcome": 100, "payee": "A"},
+            ]
+        )
+
+        result = asyncio.run(
+            DuplicatesTool().execute(client, {"year": 2025, "show_ids": True})
+        )
+        text = result.content[0].text
+
+        assert "Найдено групп возможных дублей: 1" in text
+        assert "ID: t1" in text and "ID: t2" in text
+        assert "t3" not in text
+
+    def test_models_only_for_shown_groups(self):
+        """Тест построения моделей только для выведенных групп"""
+        client = snapshot_client(
+            transaction=[
+                {"id": "t1", "date": "2025-01-01", "outcome": 100, "payee": "A"},
+                {"id": "t2", "date": "2025-01-01", "outcome": 100, "payee": "A"},
+                {"id": "t3", "date": "2024-01-01", "outcome": 50, "payee": "B"},
+                {"id": "t4", "date": "2024-01-01", "outcome": 50, "payee": "B"},
+                {"id": "t5", "date": "2024-02-01", "outcome": 70, "payee": "C"},
+            ]
+        )
+
+        result = asyncio.run(DuplicatesTool().execute(client, {"limit": 1}))
+
+        assert "Найдено групп возможных дублей: 2" in result.content[0].text
+        assert set(client.snapshot._transaction_models) == {"t3", "t4"}
+
+    def test_limit_tolerates_null_and_negative(self):
+        """Тест лимита и окна null и отрицательных значений"""
+        client = snapshot_client(
+            transaction=[
+                {"id": "t1", "date": "2025-01-01", "outcome": 100, "payee": "A"},
+                {"id": "t2", "date": "2025-01-01", "outcome": 100, "payee": "A"},
+            ]
+        )
+
+        shown = asyncio.run(
+            DuplicatesTool().execute(client, {"limit": None, "window_days": None})
+        )
+        hidden = asyncio.run(
+            DuplicatesTool().execute(client, {"limit": -1, "window_days": -3})
+        )
+
+        assert " 1. A" in shown.content[0].text
+        assert " 1. A" not in hidden.content[0].text
+        assert "и еще 1 групп" in hidden.content[0].text
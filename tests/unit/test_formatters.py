@@ -46,6 +46,17 @@ class TestFormatters:
         assert "test_id" in result
         assert "Доход" in result
 
+    def test_format_transactions_has_more(self):
+        """Тест форматирования обрезанной выборки"""
+        transactions = [
+            Transaction(id=str(i), date="2025-01-15", outcome=100) for i in range(30)
+        ]
+
+        result = format_transactions(transactions, limit=30, has_more=True)
+        assert "Показано транзакций: 30" in result
+        assert "есть еще транзакции" in result
+        assert "29. " in result
+
     def test_format_categories_basic(self):
         """Тест форматирования категорий"""
         categories = {
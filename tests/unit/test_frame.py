@@ -0,0 +1,105 @@
+"""
+Тесты для колоночного представления транзакций
+"""
+
+import random
+
+from models.transaction import TransactionFilter
+from src.snapshot import DataSnapshot
+from tests.fixtures import make_diff
+from utils.aggregation import aggregate_records
+from utils.frame import Interner, to_kopecks
+
+
+def _random_snapshot(seed, size=400):
+    rng = random.Random(seed)
+    transactions = []
+    for i in range(size):
+        amount = rng.choice([100, 250.5, 999.99, 1500])
+        record = {
+            "id": f"t{i}",
+            "date": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "payee": rng.choice([None, "Кафе", "Такси", "Работа"]),
+            "tag": [rng.choice(["c1", "c2", "missing"])],
+        }
+        if rng.random() < 0.5:
+            record["outcome"] = amount
+        else:
+            record["income"] = amount
+        transactions.append(record)
+
+    snapshot = DataSnapshot()
+    snapshot.apply_diff(
+        make_diff(
+            100,
+            tag=[{"id": "c1", "title": "Еда"}, {"id": "c2", "title": "Транспорт"}],
+            transaction=transactions,
+        )
+    )
+    return snapshot
+
+
+def _as_dict(summary):
+    return {
+        "count": summary.count,
+        "kinds": {k: (v.count, round(v.total, 2)) for k, v in summary.by_kind.items()},
+        "categories": {
+            k: (v.count, round(v.income.total, 2), round(v.outcome.total, 2))
+            for k, v in summary.by_category.items()
+        },
+        "payees": {
+            k: (v.count, round(v.total, 2)) for k, v in summary.expense_payees.items()
+        },
+        "sources": {
+            k: (v.count, round(v.total, 2)) for k, v in summary.income_sources.items()
+        },
+    }
+
+
+class TestTransactionFrame:
+    """Тесты колоночной агрегации"""
+
+    def test_matches_record_aggregation(self):
+        """Тест совпадения сводки по колонкам со сводкой по сырым записям"""
+        snapshot = _random_snapshot(21)
+        filters = [
+            TransactionFilter(),
+            TransactionFilter(year=2024, month=3, day=14),
+            TransactionFilter(date_from="2024-02-10", date_to="2024-07-01"),
+        ]
+
+        for filter_params in filters:
+            expected = aggregate_records(
+                (record for _, record in snapshot.select_records(filter_params)),
+                snapshot.kinds,
+                snapshot.category_resolver,
+            )
+            assert _as_dict(snapshot.summarize(filter_params)) == _as_dict(expected)
+
+    def test_columns(self):
+        """Тест колонок в порядке индекса дат"""
+        snapshot = DataSnapshot()
+        snapshot.apply_diff(
+            make_diff(
+                100,
+                transaction=[
+                    {"id": "t2", "date": "2024-01-02", "outcome": 10.5},
+                    {"id": "t1", "date": "2024-01-01", "income": 3, "payee": "A"},
+                ],
+            )
+        )
+
+        frame = snapshot.frame
+
+        assert frame.keys == ["t1", "t2"]
+        assert list(frame.income) == [300, 0]
+        assert list(frame.outcome) == [0, 1050]
+        assert list(frame.payees) == [0, -1]
+
+    def test_interner(self):
+        """Тест кодирования строк"""
+        interner = Interner()
+
+        assert [interner.code(v) for v in ["a", "b", "a", None]] == [0, 1, 0, -1]
+        assert interner.values == ["a", "b"]
+        assert to_kopecks(0.1 + 0.2) == 30
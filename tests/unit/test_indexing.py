@@ -0,0 +1,142 @@
+"""
+Тесты для индексов транзакций
+"""
+
+import random
+
+from models.transaction import TransactionFilter
+from utils.filtering import date_predicate, filter_months
+from utils.indexing import DateIndex, TextIndex, TransactionIndexes
+
+
+class TestDateIndex:
+    """Тесты индекса дат"""
+
+    def test_range_half_open(self):
+        """Тест выборки полуинтервала дат"""
+        index = DateIndex(
+            [("t3", "2025-01-03"), ("t1", "2025-01-01"), ("t2", "2025-01-02")]
+        )
+
+        assert index.keys == ["t1", "t2", "t3"]
+        assert index.range("2025-01-02", None) == ["t2", "t3"]
+        assert index.range(None, "2025-01-03") == ["t1", "t2"]
+        assert index.range(None, None) == ["t1", "t2", "t3"]
+
+    def test_stable_within_date(self):
+        """Тест сохранения исходного порядка внутри одной даты"""
+        index = DateIndex([("b", "2025-01-01"), ("a", "2025-01-01")])
+
+        assert index.keys == ["b", "a"]
+
+    def test_select_matches_date_predicate(self):
+        """Тест совпадения выборки по индексу с проверкой каждой даты"""
+        rng = random.Random(13)
+        items = [
+            (
+                f"t{i}",
+                f"{rng.choice([2023, 2024, 2025])}-"
+                f"{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            )
+            for i in range(500)
+        ]
+        index = DateIndex(items)
+        filters = [
+            TransactionFilter(),
+            TransactionFilter(year=2024),
+            TransactionFilter(year=2024, month=2),
+            TransactionFilter(year=2024, month=2, day=14),
+            TransactionFilter(date_from="2024-03-10"),
+            TransactionFilter(date_to="2024-03-10"),
+            TransactionFilter(date_from="2023-06-01", date_to="2024-06-30"),
+        ]
+
+        for filter_params in filters:
+            matches = date_predicate(filter_params) or (lambda date: True)
+            expected = {key for key, date in items if matches(date)}
+            assert set(index.select(filter_params)) == expected
+
+
+class TestTransactionIndexes:
+    """Тесты хэш-индексов транзакций"""
+
+    def test_index_fields(self):
+        """Тест индексации категорий, тегов, счетов, получателей и торговцев"""
+        indexes = TransactionIndexes.build(
+            [
+                (
+                    "t1",
+                    {
+                        "category": "c1",
+                        "tag": ["c2"],
+                        "incomeAccount": "a1",
+                        "outcomeAccount": "a1",
+                        "payee": "Пятёрочка",
+                        "merchant": "m1",
+                    },
+                ),
+                ("t2", {"tag": ["c1"], "outcomeAccount": "a2", "payee": "ВкусВилл"}),
+            ]
+        )
+
+        assert list(indexes.category_keys(["c1"])) == ["t1", "t2"]
+        assert list(indexes.by_account["a1"]) == ["t1"]
+        assert list(indexes.by_merchant["m1"]) == ["t1"]
+        assert list(indexes.payee_keys("вкус")) == ["t2"]
+
+    def test_remove_drops_empty_values(self):
+        """Тест удаления записи из индексов"""
+        record = {"category": "c1", "payee": "Магазин", "comment": "обед"}
+        indexes = TransactionIndexes.build([("t1", record)])
+
+        indexes.remove("t1", record)
+
+        assert indexes.by_category == {}
+        assert indexes.payees.texts == {}
+        assert indexes.payees.ngrams == {}
+        assert indexes.comments.texts == {}
+
+
+class TestTextIndex:
+    """Тесты текстового индекса"""
+
+    def test_search_matches_substring_scan(self):
+        """Тест совпадения поиска по триграммам с перебором подстрок"""
+        rng = random.Random(15)
+        words = ["Пятёрочка", "SAMOKAT", "Кофе", "кофейня", "Такси", "ЯНДЕКС"]
+        texts = {
+            f"t{i}": " ".join(rng.sample(words, rng.randint(1, 3))) for i in range(200)
+        }
+        index = TextIndex()
+        for key, text in texts.items():
+            index.add(key, text)
+
+        for query in ["коф", "КОФЕ", "кс", "samokat т", "Пятёрочка", "нет такого", ""]:
+            expected = {
+                key for key, text in texts.items() if query.lower() in text.lower()
+            }
+            assert set(index.search(query)) == expected
+
+    def test_search_by_original_payee(self):
+        """Тест поиска получателя по исходному названию из банка"""
+        indexes = TransactionIndexes.build(
+            [("t1", {"payee": "Самокат", "originalPayee": "SBER*5411*SAMOKAT"})]
+        )
+
+        assert list(indexes.payee_keys("samokat")) == ["t1"]
+        assert list(indexes.payee_keys("самокат")) == ["t1"]
+
+
+class TestFilterMonths:
+    """Тесты выбора целых месяцев фильтра"""
+
+    def test_whole_months(self):
+        """Тест фильтров по году и месяцу"""
+        assert filter_months(TransactionFilter(year=2025, month=3)) == ["2025-03"]
+        assert len(filter_months(TransactionFilter(year=2025))) == 12
+
+    def test_partial_periods(self):
+        """Тест фильтров, не совпадающих с целыми месяцами"""
+        assert filter_months(TransactionFilter()) is None
+        assert filter_months(TransactionFilter(year=2025, month=3, day=1)) is None
+        assert filter_months(TransactionFilter(date_from="2025-01-01")) is None
@@ -0,0 +1,150 @@
+"""
+Тесты для агрегации и отчетов
+"""
+
+import asyncio
+
+import httpx
+
+from models.category import Category
+from models.transaction import EXPENSE, INCOME, TRANSFER
+from reports import (
+    CashFlowReport,
+    CategoryBreakdownReport,
+    IncomeAnalysisReport,
+    MerchantAnalysisReport,
+    SpendingReport,
+)
+from src.registry import ClientRegistry
+from tests.fixtures import FakeDiffAPI, make_diff, snapshot_client
+from tools.reports import ReportsTools
+from utils.aggregation import aggregate_records
+from utils.categories import CategoryResolver
+
+TRANSACTIONS = [
+    {"id": "t1", "date": "2025-01-05", "income": 1000, "payee": "Работа"},
+    {"id": "t2", "date": "2025-01-06", "outcome": 300, "payee": "Кафе", "tag": ["c1"]},
+    {"id": "t3", "date": "2025-01-07", "outcome": 200, "payee": "Кафе", "tag": ["c1"]},
+    {
+        "id": "t4",
+        "date": "2025-01-08",
+        "outcome": 500,
+        "income": 500,
+        "incomeAccount": "a1",
+        "outcomeAccount": "a2",
+    },
+]
+
+
+class TestAggregation:
+    """Тесты сводки по транзакциям"""
+
+    def test_single_pass_totals(self):
+        """Тест итогов по типам, категориям и получателям"""
+        kinds = {"t1": INCOME, "t2": EXPENSE, "t3": EXPENSE, "t4": TRANSFER}
+        resolver = CategoryResolver({"c1": Category(id="c1", title="Рестораны")})
+
+        summary = aggregate_records(TRANSACTIONS, kinds, resolver)
+
+        assert summary.count == 4
+        assert summary.kind(INCOME).total == 1000
+        assert summary.kind(EXPENSE).count == 2
+        assert summary.kind(EXPENSE).average == 250
+        assert summary.kind(TRANSFER).count == 1
+        assert summary.by_category["Рестораны"].outcome.total == 500
+        assert summary.expense_payees["Кафе"].count == 2
+        assert summary.income_sources["Работа"].total == 1000
+
+    def test_missing_kind_is_empty(self):
+        """Тест пустых итогов для отсутствующего типа"""
+        summary = aggregate_records([], {}, CategoryResolver({}))
+
+        assert summary.kind(INCOME).count == 0
+        assert summary.kind(INCOME).average == 0.0
+
+    def test_totals_are_exact(self):
+        """Тест точного суммирования в копейках"""
+        records = [
+            {"id": f"t{i}", "date": "2025-01-01", "outcome": 0.1} for i in range(10)
+        ]
+        kinds = {record["id"]: EXPENSE for record in records}
+
+        summary = aggregate_records(records, kinds, CategoryResolver({}))
+
+        assert summary.kind(EXPENSE).kopecks == 100
+        assert summary.kind(EXPENSE).total == 1.0
+
+
+class TestReports:
+    """Тесты отображения отчетов"""
+
+    def _generate(self, report, args):
+        client = snapshot_client(
+            tag=[{"id": "c1", "title": "Рестораны"}], transaction=TRANSACTIONS
+        )
+        result = asyncio.run(report.generate(client, args))
+        return result.content[0].text
+
+    def test_cash_flow(self):
+        """Тест отчета по денежному потоку"""
+        text = self._generate(CashFlowReport(), {"year": 2025})
+
+        assert "Доходы: +1,000.00 ₽ (1 операций)" in text
+        assert "Расходы: -500.00 ₽ (2 операций)" in text
+        assert "Переводы: 1 операций" in text
+
+    def test_spending_and_categories(self):
+        """Тест отчетов по тратам и категориям"""
+        spending = self._generate(SpendingReport(), {"year": 2025, "month": 1})
+        breakdown = self._generate(CategoryBreakdownReport(), {"year": 2025})
+
+        assert "Рестораны: 500.00 ₽" in spending
+        assert "Средняя трата: 250.00 ₽" in spending
+        assert "Рестораны:\n  Транзакций: 2\n  Расходы: -500.00 ₽" in breakdown
+
+    def test_merchants_and_income(self):
+        """Тест отчетов по торговцам и доходам"""
+        merchants = self._generate(MerchantAnalysisReport(), {"year": 2025})
+        income = self._generate(IncomeAnalysisReport(), {"year": 2025})
+
+        assert " 1. Кафе\n    Сумма: 500.00 ₽\n    Транзакций: 2" in merchants
+        assert " 1. Работа\n    Сумма: +1,000.00 ₽" in income
+
+
+class TestReportsBatch:
+    """Тесты пакетного вызова отчетов"""
+
+    def test_batch_uses_one_sync(self):
+        """Тест построения нескольких отчетов по одному снимку"""
+        api = FakeDiffAPI(make_diff(100, transaction=TRANSACTIONS))
+        session = httpx.AsyncClient(transport=httpx.MockTransport(api.handler))
+        tools = ReportsTools(ClientRegistry(session=session))
+
+        result = asyncio.run(
+            tools.handle_call(
+                "reports_batch",
+                {
+                    "reports": [
+                        {"name": "reports_cash_flow", "arguments": {"year": 2025}},
+                        {"name": "reports_spending", "arguments": {"year": 2025}},
+                        {"name": "reports_unknown"},
+                    ]
+                },
+                "token",
+            )
+        )
+
+        texts = [item.text for item in result.content]
+        assert len(api.requests) == 1
+        assert len(texts) == 3
+        assert texts[0].startswith("💰 Денежный поток")
+        assert texts[1].startswith("📊 Отчет по тратам")
+        assert "Неизвестный инструмент отчетов" in texts[2]
+
+    def test_batch_requires_reports(self):
+        """Тест пустого пакета"""
+        tools = ReportsTools(ClientRegistry())
+
+        result = asyncio.run(tools.handle_call("reports_batch", {}, "token"))
+
+        assert "Не указаны отчеты" in result.content[0].text
@@ -0,0 +1,334 @@
+"""
+Тесты для снимка данных ДзенМани
+"""
+
+from itertools import islice
+
+from models.transaction import EXPENSE, INCOME, TRANSFER, TransactionFilter
+from src.snapshot import DataSnapshot
+from tests.fixtures import make_diff
+from utils.filtering import filter_transactions
+
+
+class TestDataSnapshot:
+    """Тесты применения diff к снимку"""
+
+    def test_apply_initial_diff(self):
+        """Тест применения первой полной выгрузки"""
+        snapshot = DataSnapshot()
+        changed = snapshot.apply_diff(
+            make_diff(
+                100,
+                transaction=[{"id": "t1", "date": "2025-01-01"}],
+                tag=[{"id": "c1", "title": "Продукты"}],
+            )
+        )
+
+        assert changed is True
+        assert snapshot.server_timestamp == 100
+        assert snapshot.version == 1
+        assert snapshot.records("transaction") == [{"id": "t1", "date": "2025-01-01"}]
+
+    def test_merge_changed_entities(self):
+        """Тест слияния измененных сущностей"""
+        snapshot = DataSnapshot()
+        snapshot.apply_diff(
+            make_diff(
+                100,
+                transaction=[
+                    {"id": "t1", "date": "2025-01-01", "outcome": 100},
+                    {"id": "t2", "date": "2025-01-02", "outcome": 200},
+                ],
+            )
+        )
+        snapshot.apply_diff(
+            make_diff(
+                200, transaction=[{"id": "t1", "date": "2025-01-01", "outcome": 150}]
+            )
+        )
+
+        records = snapshot.entities["transaction"]
+        assert records["t1"]["outcome"] == 150
+        assert records["t2"]["outcome"] == 200
+        assert snapshot.server_timestamp == 200
+
+    def test_apply_deletions(self):
+        """Тест удаления сущностей из снимка"""
+        snapshot = DataSnapshot()
+        snapshot.apply_diff(
+            make_diff(100, transaction=[{"id": "t1", "date": "2025-01-01"}])
+        )
+        snapshot.apply_diff(
+            make_diff(
+                200, deletion=[{"id": "t1", "object": "transaction", "stamp": 200}]
+            )
+        )
+
+        assert snapshot.records("transaction") == []
+        assert snapshot.version == 2
+
+    def test_empty_diff_keeps_version(self):
+        """Тест пустого diff без изменений"""
+        snapshot = DataSnapshot()
+        snapshot.apply_diff(
+            make_diff(100, transaction=[{"id": "t1", "date": "2025-01-01"}])
+        )
+
+        assert snapshot.apply_diff(make_diff(150)) is False
+        assert snapshot.version == 1
+        assert snapshot.server_timestamp == 150
+
+    def test_model_views_cached_per_version(self):
+        """Тест переиспользования моделей до следующего изменения"""
+        snapshot = DataSnapshot()
+        snapshot.apply_diff(
+            make_diff(
+                100,
+                transaction=[{"id": "t1", "date": "2025-01-01", "outcome": 100}],
+                tag=[{"id": "c1", "title": "Продукты"}],
+                account=[{"id": "a1", "title": "Карта", "balance": 0, "type": "ccard"}],
+            )
+        )
+
+        transactions = snapshot.transactions
+        assert snapshot.transactions is transactions
+        assert snapshot.categories["c1"].title == "Продукты"
+        assert snapshot.accounts["a1"].title == "Карта"
+
+        snapshot.apply_diff(
+            make_diff(200, transaction=[{"id": "t2", "date": "2025-01-02"}])
+        )
+        assert snapshot.transactions is not transactions
+        assert len(snapshot.transactions) == 2
+
+
+class TestSelectTransactions:
+    """Тесты выборки транзакций по сырым записям"""
+
+    def _snapshot(self):
+        snapshot = DataSnapshot()
+        snapshot.apply_diff(
+            make_diff(
+                100,
+                transaction=[
+                    {"id": "t1", "date": "2024-12-31", "outcome": 10},
+                    {"id": "t2", "date": "2025-01-15", "outcome": 20, "category": "c1"},
+                    {"id": "t3", "date": "2025-02-01", "outcome": 30},
+                ],
+            )
+        )
+        return snapshot
+
+    def test_models_built_only_for_selected(self):
+        """Тест построения моделей только для отобранных записей"""
+        snapshot = self._snapshot()
+
+        selected = snapshot.select_transactions(TransactionFilter(year=2025, month=1))
+
+        assert [t.id for t in selected] == ["t2"]
+        assert set(snapshot._transaction_models) == {"t2"}
+
+    def test_kinds_computed_from_records(self):
+        """Тест классификации по сырым записям без построения моделей"""
+        snapshot = self._snapshot()
+        snapshot.apply_diff(
+            make_diff(
+                200, transaction=[{"id": "t4", "date": "2025-02-01", "income": 30}]
+            )
+        )
+
+        assert snapshot.kinds == {
+            "t1": EXPENSE,
+            "t2": EXPENSE,
+            "t3": TRANSFER,
+            "t4": INCOME,
+        }
+        assert snapshot._transaction_models == {}
+
+    def test_matches_model_filtering(self):
+        """Тест совпадения с фильтрацией готовых моделей"""
+        snapshot = self._snapshot()
+        filters = [
+            TransactionFilter(year=2025),
+            TransactionFilter(date_from="2025-01-01", date_to="2025-01-31"),
+            TransactionFilter(date_to="2025-01-15"),
+            TransactionFilter(uncategorized_only=True),
+            TransactionFilter(category_ids=["c1"]),
+        ]
+
+        for filter_params in filters:
+            expected = filter_transactions(snapshot.transactions, filter_params)
+            assert snapshot.select_transactions(filter_params) == expected
+
+
+class TestIndexedSelection:
+    """Тесты выборки транзакций по индексам снимка"""
+
+    def test_select_by_period_in_date_order(self):
+        """Тест выборки по периоду в порядке дат"""
+        snapshot = DataSnapshot()
+        snapshot.apply_diff(
+            make_diff(
+                100,
+                transaction=[
+                    {"id": "t3", "date": "2025-02-01", "outcome": 30},
+                    {"id": "t1", "date": "2025-01-15", "outcome": 10},
+                    {"id": "t2", "date": "2025-01-31", "outcome": 20},
+                ],
+            )
+        )
+
+        selected = snapshot.select_transactions(TransactionFilter(year=2025, month=1))
+
+        assert [t.id for t in selected] == ["t1", "t2"]
+
+    def test_date_index_rebuilt_after_diff(self):
+        """Тест обновления индекса дат после нового diff"""
+        snapshot = DataSnapshot()
+        snapshot.apply_diff(
+            make_diff(100, transaction=[{"id": "t1", "date": "2025-01-15"}])
+        )
+        assert len(snapshot.date_index) == 1
+
+        snapshot.apply_diff(
+            make_diff(200, transaction=[{"id": "t2", "date": "2025-01-10"}])
+        )
+
+        selected = snapshot.select_transactions(TransactionFilter(date_to="2025-01-15"))
+        assert [t.id for t in selected] == ["t2", "t1"]
+
+    def test_indexes_follow_diffs(self):
+        """Тест поддержки индексов при изменении и удалении транзакций"""
+        snapshot = DataSnapshot()
+        snapshot.apply_diff(
+            make_diff(
+                100,
+                transaction=[
+                    {"id": "t1", "date": "2025-01-01", "category": "c1"},
+                    {"id": "t2", "date": "2025-01-02", "category": "c1"},
+                ],
+            )
+        )
+        assert list(snapshot.indexes.by_category["c1"]) == ["t1", "t2"]
+
+        snapshot.apply_diff(
+            {
+                "serverTimestamp": 200,
+                "transaction": [{"id": "t1", "date": "2025-01-01", "category": "c2"}],
+                "deletion": [{"id": "t2", "object": "transaction"}],
+            }
+        )
+
+        assert "c1" not in snapshot.indexes.by_category
+        selected = snapshot.select_transactions(TransactionFilter(category_ids=["c2"]))
+        assert [t.id for t in selected] == ["t1"]
+
+    def test_get_transaction(self):
+        """Тест получения транзакции по ID"""
+        snapshot = DataSnapshot()
+        snapshot.apply_diff(
+            make_diff(100, transaction=[{"id": "t1", "date": "2025-01-01"}])
+        )
+
+        assert snapshot.get_transaction("t1").date == "2025-01-01"
+        assert snapshot.get_transaction("missing") is None
+
+    def test_iter_newest_first(self):
+        """Тест ленивой выборки от новых к старым"""
+        snapshot = DataSnapshot()
+        snapshot.apply_diff(
+            make_diff(
+                100,
+                transaction=[
+                    {"id": f"t{i}", "date": f"2025-01-{i:02d}", "category": "c1"}
+                    for i in range(1, 11)
+                ],
+            )
+        )
+
+        for filter_params in (
+            TransactionFilter(year=2025),
+            TransactionFilter(category_ids=["c1"]),
+        ):
+            newest = snapshot.iter_transactions(filter_params, newest_first=True)
+            expected = snapshot.select_transactions(filter_params)[::-1]
+            assert list(newest) == expected
+
+    def test_iter_builds_only_read_models(self):
+        """Тест построения моделей только для прочитанных транзакций"""
+        snapshot = DataSnapshot()
+        snapshot.apply_diff(
+            make_diff(
+                100,
+                transaction=[
+                    {"id": f"t{i}", "date": f"2025-01-{i:02d}"} for i in range(1, 11)
+                ],
+            )
+        )
+
+        latest = islice(
+            snapshot.iter_transactions(TransactionFilter(), newest_first=True), 2
+        )
+
+        assert [t.id for t in latest] == ["t10", "t9"]
+        assert set(snapshot._transaction_models) == {"t10", "t9"}
+
+
+class TestMonthlyRollups:
+    """Тесты помесячных сводок снимка"""
+
+    def _snapshot(self):
+        snapshot = DataSnapshot()
+        snapshot.apply_diff(
+            make_diff(
+                100,
+                transaction=[
+                    {"id": "t1", "date": "2025-01-10", "outcome": 100},
+                    {"id": "t2", "date": "2025-01-20", "income": 500},
+                    {"id": "t3", "date": "2025-02-05", "outcome": 300},
+                    {"id": "t4", "date": "2025-02-05", "income": 300},
+                ],
+            )
+        )
+        return snapshot
+
+    def test_month_summary(self):
+        """Тест сводки за месяц с учетом парных переводов"""
+        snapshot = self._snapshot()
+
+        january = snapshot.month_summary("2025-01")
+        february = snapshot.month_summary("2025-02")
+
+        assert january.kind(EXPENSE).total == 100
+        assert january.kind(INCOME).total == 500
+        assert february.kind(TRANSFER).count == 1
+        assert february.kind(EXPENSE).count == 0
+
+    def test_only_changed_months_rebuilt(self):
+        """Тест пересчета только затронутых месяцев"""
+        snapshot = self._snapshot()
+        january = snapshot.month_summary("2025-01")
+        february = snapshot.month_summary("2025-02")
+
+        snapshot.apply_diff(
+            make_diff(
+                200, transaction=[{"id": "t3", "date": "2025-02-05", "outcome": 250}]
+            )
+        )
+
+        assert snapshot.month_summary("2025-01") is january
+        updated = snapshot.month_summary("2025-02")
+        assert updated is not february
+        assert updated.kind(EXPENSE).total == 250
+
+    def test_summarize_year(self):
+        """Тест сводки за год из помесячных сводок"""
+        snapshot = self._snapshot()
+
+        summary = snapshot.summarize_months(f"2025-{m:02d}" for m in range(1, 13))
+
+        assert summary.count == 4
+        assert summary.kind(EXPENSE).total == 100
+        assert summary.kind(TRANSFER).count == 1
+        # Парным переводом считается только списание, зачисление - доход
+        assert summary.kind(INCOME).total == 800
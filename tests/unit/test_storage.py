@@ -0,0 +1,182 @@
+"""
+Тесты для локального хранилища данных и файлов снимков
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from src.snapshot import DataSnapshot
+from src.storage import SnapshotFile, SQLiteStore
+from tests.fixtures import FakeDiffAPI, make_diff
+
+
+class TestSQLiteStore:
+    """Тесты хранилища SQLite"""
+
+    def test_roundtrip_with_deletions(self, tmp_path):
+        """Тест сохранения изменений и удалений"""
+        store = SQLiteStore(str(tmp_path / "zenmoney.db"))
+        store.save_diff(
+            "owner",
+            make_diff(
+                100,
+                transaction=[
+                    {"id": "t1", "date": "2025-01-01"},
+                    {"id": "t2", "date": "2025-01-02"},
+                ],
+                instrument=[{"id": 2, "shortTitle": "RUB"}],
+            ),
+            100,
+        )
+        store.save_diff(
+            "owner",
+            make_diff(200, deletion=[{"id": "t1", "object": "transaction"}]),
+            200,
+        )
+
+        data = store.load("owner")
+        store.close()
+
+        assert data["serverTimestamp"] == 200
+        assert data["transaction"] == [{"id": "t2", "date": "2025-01-02"}]
+        assert data["instrument"] == [{"id": 2, "shortTitle": "RUB"}]
+
+    def test_unknown_owner(self, tmp_path):
+        """Тест отсутствия данных для другого пользователя"""
+        store = SQLiteStore(str(tmp_path / "zenmoney.db"))
+        assert store.load("missing") is None
+        store.close()
+
+    def test_restart_pulls_only_delta(self, tmp_path):
+        """Тест запуска с диска и запроса только дельты"""
+        path = str(tmp_path / "zenmoney.db")
+        first = FakeDiffAPI(make_diff(100, transaction=[{"id": "t1", "date": "d"}]))
+        asyncio.run(first.client(store=SQLiteStore(path)).sync())
+
+        second = FakeDiffAPI(make_diff(150, transaction=[{"id": "t2", "date": "d"}]))
+        client = second.client(store=SQLiteStore(path))
+        snapshot = asyncio.run(client.sync())
+
+        assert second.requests[0]["serverTimestamp"] == 100
+        assert {t.id for t in snapshot.transactions} == {"t1", "t2"}
+
+
+class TestSnapshotFile:
+    """Тесты бинарного файла снимка"""
+
+    def test_warm_start_keeps_models(self, tmp_path):
+        """Тест запуска из файла снимка с запросом только дельты"""
+        first = FakeDiffAPI(
+            make_diff(100, transaction=[{"id": "t1", "date": "d"}]),
+            make_diff(120, transaction=[{"id": "t3", "date": "d"}]),
+        )
+        first_client = first.client(snapshot_file=SnapshotFile(str(tmp_path)))
+
+        async def display_and_resync():
+            snapshot = await first_client.sync()
+            snapshot.get_transaction("t1")
+            await first_client.sync()
+            await first_client.aclose()
+
+        asyncio.run(display_and_resync())
+
+        second = FakeDiffAPI(make_diff(150, transaction=[{"id": "t2", "date": "d"}]))
+        client = second.client(snapshot_file=SnapshotFile(str(tmp_path)))
+        snapshot = asyncio.run(client.sync())
+
+        assert second.requests[0]["serverTimestamp"] == 120
+        # Сохраняются только показанные модели, остальные строятся по требованию
+        assert set(snapshot._transaction_models) == {"t1"}
+        assert {t.id for t in snapshot.transactions} == {"t1", "t2", "t3"}
+
+    def test_foreign_file_ignored(self, tmp_path):
+        """Тест игнорирования файла чужого формата"""
+        snapshot_file = SnapshotFile(str(tmp_path))
+        with open(snapshot_file.path_for("owner"), "wb") as f:
+            f.write(b"not a snapshot")
+
+        assert snapshot_file.load("owner") is None
+
+    def test_store_added_later_keeps_history(self, tmp_path):
+        """Тест заполнения хранилища из файла снимка и работы без файла"""
+        snapshot_dir = str(tmp_path / "snapshots")
+        db_path = str(tmp_path / "zenmoney.db")
+        history = [{"id": f"t{i}", "date": "d"} for i in range(5)]
+
+        first = FakeDiffAPI(make_diff(100, transaction=history))
+        first_client = first.client(snapshot_file=SnapshotFile(snapshot_dir))
+
+        async def sync_and_close():
+            await first_client.sync()
+            await first_client.aclose()
+
+        asyncio.run(sync_and_close())
+
+        # Файл не перезаписывается: дальше он отстает от хранилища
+        second = FakeDiffAPI(make_diff(200, transaction=[{"id": "t9", "date": "d"}]))
+        asyncio.run(
+            second.client(
+                store=SQLiteStore(db_path), snapshot_file=SnapshotFile(snapshot_dir)
+            ).sync()
+        )
+
+        third = FakeDiffAPI(make_diff(200))
+        snapshot = asyncio.run(
+            third.client(
+                store=SQLiteStore(db_path), snapshot_file=SnapshotFile(snapshot_dir)
+            ).sync()
+        )
+        assert third.requests[0]["serverTimestamp"] == 200
+        assert len(snapshot.records("transaction")) == 6
+
+        os.remove(SnapshotFile(snapshot_dir).path_for(first_client.owner_key))
+        fourth = FakeDiffAPI(make_diff(200))
+        snapshot = asyncio.run(fourth.client(store=SQLiteStore(db_path)).sync())
+
+        assert fourth.requests[0]["serverTimestamp"] == 200
+        assert {r["id"] for r in snapshot.records("transaction")} == {
+            "t0",
+            "t1",
+            "t2",
+            "t3",
+            "t4",
+            "t9",
+        }
+
+    def test_save_deferred_until_close(self, tmp_path):
+        """Тест записи файла вне пути запроса и без построения представлений"""
+        snapshot_file = SnapshotFile(str(tmp_path))
+        api = FakeDiffAPI(make_diff(100, transaction=[{"id": "t1", "date": "d"}]))
+        client = api.client(snapshot_file=snapshot_file)
+
+        async def sync_and_close():
+            await client.sync()
+            written = os.path.exists(snapshot_file.path_for(client.owner_key))
+            await client.aclose()
+            return written
+
+        assert asyncio.run(sync_and_close()) is False
+        snapshot = snapshot_file.load(client.owner_key)
+        assert snapshot.server_timestamp == 100
+        assert "frame" not in snapshot._cache
+
+    def test_other_format_version_ignored(self, tmp_path):
+        """Тест игнорирования файла другой версии формата"""
+        snapshot_file = SnapshotFile(str(tmp_path))
+        data = SnapshotFile.dumps(DataSnapshot())
+        snapshot_file.save("owner", b"ZMSNAP1\n" + data[len(SnapshotFile.header()) :])
+
+        assert snapshot_file.load("owner") is None
+
+    @pytest.mark.skipif(not hasattr(os, "getuid"), reason="права POSIX")
+    def test_writable_by_others_ignored(self, tmp_path):
+        """Тест отказа загружать файл, доступный на запись другим"""
+        snapshot_file = SnapshotFile(str(tmp_path))
+        snapshot_file.save("owner", SnapshotFile.dumps(DataSnapshot()))
+        assert snapshot_file.load("owner") is not None
+
+        os.chmod(snapshot_file.path_for("owner"), 0o666)
+
+        assert snapshot_file.load("owner") is None
@@ -0,0 +1,72 @@
+"""
+Тесты для потокового разбора ответа diff API
+"""
+
+import json
+
+import pytest
+
+from src.streaming import DiffStreamParser
+
+SAMPLE = {
+    "serverTimestamp": 1735689600,
+    "rate": -12.5,
+    "instrument": [{"id": 2, "shortTitle": "RUB", "rate": 1.0}],
+    "tag": [],
+    "transaction": [
+        {"id": "t1", "date": "2025-01-01", "outcome": 120.5, "payee": 'Кафе "Ёж" [1]'},
+        {"id": "t2", "date": "2025-01-02", "income": 1000, "tag": ["c1", "c2"]},
+    ],
+    "deletion": [{"id": "t0", "object": "transaction", "stamp": 1735689000}],
+}
+
+
+def _parse(text, chunk_size):
+    parser = DiffStreamParser()
+    events = []
+    for i in range(0, len(text), chunk_size):
+        events.extend(parser.feed(text[i : i + chunk_size]))
+    parser.close()
+    return parser, events
+
+
+class TestDiffStreamParser:
+    """Тесты потокового парсера"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 100000])
+    def test_any_chunking_matches_json(self, chunk_size):
+        """Тест совпадения с json.loads при любом разбиении на чанки"""
+        text = json.dumps(SAMPLE, ensure_ascii=False, indent=1)
+        parser, events = _parse(text, chunk_size)
+
+        assert parser.scalars == {"serverTimestamp": 1735689600, "rate": -12.5}
+        rebuilt = {}
+        for key, record in events:
+            rebuilt.setdefault(key, []).append(record)
+        expected = {k: v for k, v in SAMPLE.items() if isinstance(v, list) and v}
+        assert rebuilt == expected
+
+    def test_number_split_after_point(self):
+        """Тест числа, разрезанного границей чанка после точки"""
+        parser = DiffStreamParser()
+        parser.feed('{"x": -12.')
+        events = parser.feed('5, "t": [1e')
+        events += parser.feed("3]}")
+        parser.close()
+
+        assert parser.scalars == {"x": -12.5}
+        assert events == [("t", 1000.0)]
+
+    def test_truncated_response(self):
+        """Тест ошибки на оборванном ответе"""
+        text = json.dumps(SAMPLE)
+        parser = DiffStreamParser()
+        parser.feed(text[: len(text) // 2])
+
+        with pytest.raises(ValueError):
+            parser.close()
+
+    def test_invalid_response(self):
+        """Тест ошибки на ответе не в формате объекта"""
+        with pytest.raises(ValueError):
+            DiffStreamParser().feed("[1, 2]")
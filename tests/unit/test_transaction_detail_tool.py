@@ -4,11 +4,17 @@
 
 import asyncio
 import unittest
-from unittest.mock import AsyncMock, Mock
 
 from data_tools.transaction_detail import TransactionDetailTool
 from models.transaction import Transaction
-from src.client import ZenMoneyClient
+from tests.fixtures import snapshot_client
+
+
+def _client_with(*transactions):
+    """Заглушка клиента со снимком из заданных транзакций"""
+    return snapshot_client(
+        transaction=[t.model_dump(exclude_none=True) for t in transactions]
+    )
 
 
 class TestTransactionDetailTool(unittest.TestCase):
@@ -17,7 +23,7 @@ class TestTransactionDetailTool(unittest.TestCase):
     def setUp(self):
         """Настройка тестов"""
         self.tool = TransactionDetailTool()
-        self.mock_client = Mock(spec=ZenMoneyClient)
+        self.mock_client = _client_with()
 
     def test_tool_creation(self):
         """Тест создания инструмента"""
@@ -35,9 +41,6 @@ class TestTransactionDetailTool(unittest.TestCase):
 
     def test_transaction_not_found(self):
         """Тест обработки несуществующей транзакции"""
-        self.mock_client.get_transactions = AsyncMock(return_value=[])
-        self.mock_client.get_categories = AsyncMock(return_value={})
-        self.mock_client.get_accounts = AsyncMock(return_value={})
 
         async def run_test():
             result = await self.tool.execute(
@@ -57,9 +60,7 @@ class TestTransactionDetailTool(unittest.TestCase):
             payee="Test Store",
         )
 
-        self.mock_client.get_transactions = AsyncMock(return_value=[mock_transaction])
-        self.mock_client.get_categories = AsyncMock(return_value={})
-        self.mock_client.get_accounts = AsyncMock(return_value={})
+        self.mock_client = _client_with(mock_transaction)
 
         async def run_test():
             result = await self.tool.execute(
@@ -87,9 +88,7 @@ class TestTransactionDetailTool(unittest.TestCase):
             qrCode=qr_code,
         )
 
-        self.mock_client.get_transactions = AsyncMock(return_value=[mock_transaction])
-        self.mock_client.get_categories = AsyncMock(return_value={})
-        self.mock_client.get_accounts = AsyncMock(return_value={})
+        self.mock_client = _client_with(mock_transaction)
 
         async def run_test():
             result = await self.tool.execute(
@@ -123,9 +122,7 @@ class TestTransactionDetailTool(unittest.TestCase):
             longitude=37.6176,
         )
 
-        self.mock_client.get_transactions = AsyncMock(return_value=[mock_transaction])
-        self.mock_client.get_categories = AsyncMock(return_value={})
-        self.mock_client.get_accounts = AsyncMock(return_value={})
+        self.mock_client = _client_with(mock_transaction)
 
         async def run_test():
             result = await self.tool.execute(
@@ -2,9 +2,18 @@
 Юнит-тесты для модели Transaction
 """
 
+import random
 import unittest
 
-from models.transaction import Transaction
+from models.transaction import (
+    EXPENSE,
+    INCOME,
+    OTHER,
+    TRANSFER,
+    Transaction,
+    classify_rows,
+    record_row,
+)
 
 
 class TestTransactionModel(unittest.TestCase):
@@ -90,5 +99,62 @@ class TestTransactionModel(unittest.TestCase):
         self.assertEqual(t.tag, ["category-1", "category-2"])
 
 
+class TestClassifyRows(unittest.TestCase):
+    """Тесты определения типов операций за один проход"""
+
+    def test_paired_operations(self):
+        """Тест парных операций списания и зачисления"""
+        records = [
+            {"id": "out", "date": "2025-01-01", "outcome": 1000.0},
+            {"id": "in", "date": "2025-01-01", "income": 1000.005},
+            {"id": "other-day", "date": "2025-01-02", "outcome": 1000.0},
+            {
+                "id": "accounts",
+                "date": "2025-01-03",
+                "income": 50.0,
+                "outcome": 50.0,
+                "incomeAccount": "a1",
+                "outcomeAccount": "a2",
+            },
+        ]
+
+        kinds = classify_rows(map(record_row, records))
+
+        self.assertEqual(
+            kinds,
+            {"out": TRANSFER, "in": INCOME, "other-day": EXPENSE, "accounts": TRANSFER},
+        )
+
+    def test_matches_pairwise_checks(self):
+        """Тест совпадения с попарными проверками модели"""
+        rng = random.Random(42)
+        records = []
+        for i in range(300):
+            amount = rng.choice([100.0, 250.5, 999.99, 1000.0, 1000.01])
+            income, outcome = (amount, 0.0) if rng.random() < 0.4 else (0.0, amount)
+            records.append(
+                {
+                    "id": f"t{i}",
+                    "date": f"2025-01-{rng.randint(1, 5):02d}",
+                    "income": income,
+                    "outcome": outcome,
+                }
+            )
+        transactions = [Transaction(**record) for record in records]
+
+        kinds = classify_rows(map(record_row, records))
+
+        for t in transactions:
+            if t.is_transfer(transactions):
+                expected_kind = TRANSFER
+            elif t.is_income:
+                expected_kind = INCOME
+            elif t.is_expense(transactions):
+                expected_kind = EXPENSE
+            else:
+                expected_kind = OTHER
+            self.assertEqual(kinds[t.id], expected_kind)
+
+
 if __name__ == "__main__":
     unittest.main()
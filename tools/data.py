@@ -2,31 +2,37 @@
 Инструменты получения данных для MCP сервера
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from mcp.types import CallToolResult, TextContent, Tool
 
 from data_tools.accounts import AccountsTool
 from data_tools.categories import CategoresTool
+from data_tools.duplicates import DuplicatesTool
 from data_tools.export import DataExportTool
 from data_tools.merchants import MerchantsTool
 from data_tools.transaction_detail import TransactionDetailTool
 from data_tools.transactions import TransactionsTool
 from data_tools.update_transaction import UpdateTransactionTool
-from src.client import ZenMoneyClient
+from src.registry import ClientRegistry
 from utils.routing import DataToolsRouter
 
 
 class DataTools:
     """Класс инструментов получения данных"""
 
-    def __init__(self) -> None:
+    # Инструменты, изменяющие данные (их результаты не кэшируются)
+    WRITE_TOOLS = frozenset({"data_set_transaction"})
+
+    def __init__(self, clients: Optional[ClientRegistry] = None) -> None:
+        self.clients = clients or ClientRegistry()
         self.transactions_tool = TransactionsTool()
         self.transaction_detail_tool = TransactionDetailTool()
         self.categories_tool = CategoresTool()
         self.accounts_tool = AccountsTool()
         self.merchants_tool = MerchantsTool()
         self.export_tool = DataExportTool()
+        self.duplicates_tool = DuplicatesTool()
         self.update_transaction_tool = UpdateTransactionTool()
 
         self.router = DataToolsRouter(
@@ -37,6 +43,7 @@ class DataTools:
                 "data_get_accounts": self.accounts_tool,
                 "data_get_merchants": self.merchants_tool,
                 "data_export": self.export_tool,
+                "data_find_duplicates": self.duplicates_tool,
                 "data_set_transaction": self.update_transaction_tool,
             }
         )
@@ -46,7 +53,9 @@ class DataTools:
         return [
             Tool(
                 name="data_get_transactions",
-                description="Получить транзакции с фильтрацией по периоду",
+                description=(
+                    "Получить транзакции с фильтрацией по периоду (от новых к старым)"
+                ),
                 inputSchema={
                     "type": "object",
                     "properties": {
@@ -72,7 +81,16 @@ class DataTools:
                         },
                         "payee": {
                             "type": "string",
-                            "description": "Поиск по получателю (частичное совпадение)",
+                            "description": (
+                                "Поиск по получателю или исходному названию "
+                                "из банка (частичное совпадение)"
+                            ),
+                        },
+                        "comment": {
+                            "type": "string",
+                            "description": (
+                                "Поиск по комментарию (частичное совпадение)"
+                            ),
                         },
                         "show_ids": {
                             "type": "boolean",
@@ -87,8 +105,8 @@ class DataTools:
                             "type": "array",
                             "items": {"type": "string"},
                             "description": (
-                                "Фильтр по категориям "
-                                "(список ID или названий категорий)"
+                                "Фильтр по категориям (список ID или названий "
+                                "категорий, родительская включает вложенные)"
                             ),
                         },
                     },
@@ -179,6 +197,52 @@ class DataTools:
                     },
                 },
             ),
+            Tool(
+                name="data_find_duplicates",
+                description="Поиск возможных дублей транзакций за период",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "year": {
+                            "type": "integer",
+                            "description": "Год (например, 2025)",
+                        },
+                        "month": {
+                            "type": "integer",
+                            "description": "Месяц (например, 12)",
+                        },
+                        "day": {
+                            "type": "integer",
+                            "description": "День (например, 15)",
+                        },
+                        "date_from": {
+                            "type": "string",
+                            "description": "Дата начала в формате YYYY-MM-DD",
+                        },
+                        "date_to": {
+                            "type": "string",
+                            "description": "Дата окончания в формате YYYY-MM-DD",
+                        },
+                        "window_days": {
+                            "type": "integer",
+                            "description": (
+                                "Допустимая разница дат в днях "
+                                "(0 - только в один день)"
+                            ),
+                            "default": 0,
+                        },
+                        "show_ids": {
+                            "type": "boolean",
+                            "description": "Показывать ID транзакций",
+                            "default": False,
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Лимит групп (по умолчанию 20)",
+                        },
+                    },
+                },
+            ),
             Tool(
                 name="data_set_transaction",
                 description=(
@@ -197,9 +261,16 @@ class DataTools:
                 content=[TextContent(type="text", text="❌ Требуется аутентификация")]
             )
 
+        client = self.clients.get(auth_token)
         try:
-            client = ZenMoneyClient(auth_token)
-            return await self.router.route_call(name, arguments, client)
+            if name in self.WRITE_TOOLS or name not in self.router.tools:
+                return await self.router.route_call(name, arguments, client)
+            # Чтение данных кэшируется до следующего изменения снимка
+            return await client.cached_call(
+                name,
+                arguments,
+                lambda: self.router.route_call(name, arguments, client),
+            )
         except Exception as e:
             return CallToolResult(
                 content=[
@@ -2,28 +2,43 @@
 Инструменты отчетов для MCP сервера
 """
 
-from typing import Any, Dict, List
+import asyncio
+from typing import Any, Dict, List, Optional
 
 from mcp.types import CallToolResult, TextContent, Tool
 
+from reports.base import BaseReport
 from reports.cash_flow import CashFlowReport
 from reports.category import CategoryBreakdownReport
 from reports.income import IncomeAnalysisReport
 from reports.merchant import MerchantAnalysisReport
 from reports.spending import SpendingReport
 from src.client import ZenMoneyClient
+from src.registry import ClientRegistry
+
+# Максимальное количество отчетов в одном пакетном вызове
+MAX_BATCH_REPORTS = 20
 
 
 class ReportsTools:
     """Класс инструментов отчетов"""
 
-    def __init__(self) -> None:
+    def __init__(self, clients: Optional[ClientRegistry] = None) -> None:
+        self.clients = clients or ClientRegistry()
         self.spending_report = SpendingReport()
         self.category_report = CategoryBreakdownReport()
         self.merchant_report = MerchantAnalysisReport()
         self.income_report = IncomeAnalysisReport()
         self.cash_flow_report = CashFlowReport()
 
+        self.reports: Dict[str, BaseReport] = {
+            "reports_spending": self.spending_report,
+            "reports_category_breakdown": self.category_report,
+            "reports_merchant_analysis": self.merchant_report,
+            "reports_income_analysis": self.income_report,
+            "reports_cash_flow": self.cash_flow_report,
+        }
+
     def _get_date_input_schema(self) -> Dict[str, Any]:
         """Универсальная схема параметров даты для отчетов"""
         return {
@@ -83,6 +98,38 @@ class ReportsTools:
                 description="Денежный поток: доходы vs расходы за период",
                 inputSchema=base_schema,
             ),
+            Tool(
+                name="reports_batch",
+                description=("Несколько отчетов за один вызов по одному снимку данных"),
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "reports": {
+                            "type": "array",
+                            "description": (
+                                f"Отчеты (не более {MAX_BATCH_REPORTS}) "
+                                "с параметрами"
+                            ),
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "name": {
+                                        "type": "string",
+                                        "description": "Название отчета",
+                                        "enum": list(self.reports),
+                                    },
+                                    "arguments": {
+                                        **base_schema,
+                                        "description": "Параметры отчета",
+                                    },
+                                },
+                                "required": ["name"],
+                            },
+                        }
+                    },
+                    "required": ["reports"],
+                },
+            ),
         ]
 
     async def handle_call(
@@ -95,25 +142,64 @@ class ReportsTools:
                 content=[TextContent(type="text", text="❌ Требуется аутентификация")]
             )
 
+        client = self.clients.get(token)
         try:
-            client = ZenMoneyClient(token)
-
-            if name == "reports_spending":
-                return await self.spending_report.generate(client, arguments)
-            elif name == "reports_category_breakdown":
-                return await self.category_report.generate(client, arguments)
-            elif name == "reports_merchant_analysis":
-                return await self.merchant_report.generate(client, arguments)
-            elif name == "reports_income_analysis":
-                return await self.income_report.generate(client, arguments)
-            elif name == "reports_cash_flow":
-                return await self.cash_flow_report.generate(client, arguments)
-            else:
+            if name == "reports_batch":
+                return await self._run_batch(client, arguments)
+
+            report = self.reports.get(name)
+            if report is None:
                 raise ValueError(f"Неизвестный инструмент отчетов: {name}")
 
+            # Отчет кэшируется до следующего изменения снимка
+            return await client.cached_call(
+                name, arguments, lambda: report.generate(client, arguments)
+            )
         except Exception as e:
             return CallToolResult(
                 content=[
                     TextContent(type="text", text=f"❌ Ошибка создания отчета: {e}")
                 ]
             )
+
+    async def _run_batch(
+        self, client: ZenMoneyClient, arguments: Dict[str, Any]
+    ) -> CallToolResult:
+        """Пакет отчетов: одна синхронизация и конкурентное построение"""
+        requests = arguments.get("reports") or []
+        if not requests:
+            raise ValueError("Не указаны отчеты")
+        if len(requests) > MAX_BATCH_REPORTS:
+            raise ValueError(f"Не более {MAX_BATCH_REPORTS} отчетов за вызов")
+
+        await client.get_snapshot()
+        with client.pinned():
+            results = await asyncio.gather(
+                *(self._run_batch_item(client, request) for request in requests)
+            )
+
+        return CallToolResult(
+            content=[item for result in results for item in result.content]
+        )
+
+    async def _run_batch_item(
+        self, client: ZenMoneyClient, request: Dict[str, Any]
+    ) -> CallToolResult:
+        """Один отчет пакета (ошибка не прерывает остальные)"""
+        name = request.get("name", "")
+        arguments = request.get("arguments") or {}
+        report = self.reports.get(name)
+        try:
+            if report is None:
+                raise ValueError(f"Неизвестный инструмент отчетов: {name}")
+            return await client.cached_call(
+                name, arguments, lambda: report.generate(client, arguments)
+            )
+        except Exception as e:
+            return CallToolResult(
+                content=[
+                    TextContent(
+                        type="text", text=f"❌ Ошибка создания отчета {name}: {e}"
+                    )
+                ]
+            )
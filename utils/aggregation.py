@@ -0,0 +1,148 @@
+"""
+Общая агрегация транзакций для отчетов
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+from models.transaction import EXPENSE, INCOME
+from utils.categories import CategoryResolver
+
+
+def to_kopecks(amount: Optional[float]) -> int:
+    """Сумма в копейках"""
+    return round((amount or 0.0) * 100)
+
+
+class Totals:
+    """Количество операций и их сумма
+
+    Сумма копится в целых копейках без накопления ошибки округления,
+    в рубли она переводится только для отображения
+    """
+
+    __slots__ = ("count", "kopecks")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.kopecks = 0
+
+    def add(self, kopecks: int, count: int = 1) -> None:
+        self.count += count
+        self.kopecks += kopecks
+
+    def merge(self, other: "Totals") -> None:
+        self.count += other.count
+        self.kopecks += other.kopecks
+
+    @property
+    def total(self) -> float:
+        """Сумма в рублях"""
+        return self.kopecks / 100
+
+    @property
+    def average(self) -> float:
+        """Средняя сумма операции в рублях"""
+        return self.kopecks / self.count / 100 if self.count else 0.0
+
+
+class CategoryTotals:
+    """Операции категории: все, доходы и расходы"""
+
+    __slots__ = ("count", "income", "outcome")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.income = Totals()
+        self.outcome = Totals()
+
+    def merge(self, other: "CategoryTotals") -> None:
+        self.count += other.count
+        self.income.merge(other.income)
+        self.outcome.merge(other.outcome)
+
+
+class Aggregation:
+    """Сводка по срезу транзакций, собираемая за один проход
+
+    Отчеты только отображают нужные им части сводки: итоги по типам
+    операций, по категориям и по получателям доходов и расходов.
+    Сводки за разные периоды складываются через merge
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.by_kind: Dict[str, Totals] = {}
+        self.by_category: Dict[str, CategoryTotals] = {}
+        self.expense_payees: Dict[str, Totals] = {}
+        self.income_sources: Dict[str, Totals] = {}
+
+    def kind(self, kind: str) -> Totals:
+        """Итоги по типу операций (INCOME, EXPENSE, TRANSFER, OTHER)"""
+        return self.by_kind.get(kind) or Totals()
+
+    def add_group(
+        self,
+        kind: str,
+        category: str,
+        payee: Optional[str],
+        income: int,
+        outcome: int,
+        count: int = 1,
+    ) -> None:
+        """Учет группы транзакций с одинаковыми типом, категорией и получателем
+
+        income и outcome - суммы по группе в копейках
+        """
+        self.count += count
+
+        by_kind = self.by_kind.get(kind)
+        if by_kind is None:
+            by_kind = self.by_kind[kind] = Totals()
+        by_category = self.by_category.get(category)
+        if by_category is None:
+            by_category = self.by_category[category] = CategoryTotals()
+        by_category.count += count
+
+        if kind == INCOME:
+            by_kind.add(income, count)
+            by_category.income.add(income, count)
+            source = payee or "Неизвестный источник"
+            self.income_sources.setdefault(source, Totals()).add(income, count)
+        elif kind == EXPENSE:
+            by_kind.add(outcome, count)
+            by_category.outcome.add(outcome, count)
+            if payee:
+                self.expense_payees.setdefault(payee, Totals()).add(outcome, count)
+        else:
+            by_kind.add(0, count)
+
+    def merge(self, other: "Aggregation") -> None:
+        """Добавление сводки за другой период"""
+        self.count += other.count
+        for target, source in (
+            (self.by_kind, other.by_kind),
+            (self.expense_payees, other.expense_payees),
+            (self.income_sources, other.income_sources),
+        ):
+            for key, totals in source.items():
+                target.setdefault(key, Totals()).merge(totals)
+        for key, category in other.by_category.items():
+            self.by_category.setdefault(key, CategoryTotals()).merge(category)
+
+
+def aggregate_records(
+    records: Iterable[Dict[str, Any]],
+    kinds: Dict[str, str],
+    resolver: CategoryResolver,
+) -> Aggregation:
+    """Сводка по сырым записям транзакций, без построения моделей"""
+    result = Aggregation()
+    for record in records:
+        result.add_group(
+            kinds[record["id"]],
+            resolver.record_name(record),
+            record.get("payee"),
+            to_kopecks(record.get("income")),
+            to_kopecks(record.get("outcome")),
+        )
+    return result
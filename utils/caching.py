@@ -0,0 +1,58 @@
+"""
+Кэш результатов инструментов
+"""
+
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Ключ результата: (инструмент, нормализованные аргументы)
+ResultKey = Tuple[str, str]
+
+
+def normalize_arguments(arguments: Optional[Dict[str, Any]]) -> str:
+    """Аргументы вызова в виде строки, не зависящей от порядка ключей
+
+    Аргументы со значением None равнозначны отсутствующим
+    """
+    present = {k: v for k, v in (arguments or {}).items() if v is not None}
+    return json.dumps(present, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class ResultCache:
+    """LRU-кэш результатов для одной версии снимка
+
+    Результат действителен, пока не изменилась версия снимка: при первом
+    обращении с новой версией все записи сбрасываются
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self.version: Optional[int] = None
+        self._entries: "OrderedDict[ResultKey, Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: ResultKey, version: int) -> Optional[Any]:
+        """Результат для версии снимка (None - нет в кэше)"""
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+            return None
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+        return result
+
+    def put(self, key: ResultKey, version: int, result: Any) -> None:
+        """Сохранение результата, вытесняя давно не использованные"""
+        if self.maxsize <= 0:
+            return
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
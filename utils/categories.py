@@ -0,0 +1,94 @@
+"""
+Разрешение категорий и их иерархии
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from models.category import Category
+from models.transaction import Transaction
+
+# Название для транзакций без известной категории
+UNCATEGORIZED = "Без категории"
+
+
+class CategoryResolver:
+    """Справочник категорий снимка
+
+    Все соответствия строятся один раз: ID -> название, название (без учета
+    регистра) -> ID, ID -> корневая категория и категория -> все вложенные.
+    Определение категории транзакции и фильтры по категориям сводятся
+    к обращениям к словарям
+    """
+
+    def __init__(self, categories: Dict[str, Category]) -> None:
+        self.titles: Dict[str, str] = {
+            cat_id: cat.title for cat_id, cat in categories.items()
+        }
+        self.ids_by_title: Dict[str, List[str]] = {}
+        for cat_id, cat in categories.items():
+            self.ids_by_title.setdefault(cat.title.lower(), []).append(cat_id)
+
+        self.roots: Dict[str, str] = {
+            cat_id: self._find_root(cat_id, categories) for cat_id in categories
+        }
+        self.descendants: Dict[str, Set[str]] = {}
+        for cat_id in categories:
+            parent = categories[cat_id].parent
+            seen = {cat_id}
+            # Категория добавляется во вложенные всем предкам
+            while parent in categories and parent not in seen:
+                self.descendants.setdefault(parent, set()).add(cat_id)
+                seen.add(parent)
+                parent = categories[parent].parent
+
+    @staticmethod
+    def _find_root(cat_id: str, categories: Dict[str, Category]) -> str:
+        seen = {cat_id}
+        parent = categories[cat_id].parent
+        while parent in categories and parent not in seen:
+            cat_id = parent
+            seen.add(cat_id)
+            parent = categories[cat_id].parent
+        return cat_id
+
+    def category_id(self, transaction: Transaction) -> Optional[str]:
+        """ID категории транзакции: поле category, иначе первый тег"""
+        return self._known_id(transaction.category, transaction.tag)
+
+    def record_name(self, record: Dict[str, Any]) -> str:
+        """Название категории сырой записи транзакции"""
+        return self.title(self._known_id(record.get("category"), record.get("tag")))
+
+    def _known_id(
+        self, category: Optional[str], tags: Optional[List[str]]
+    ) -> Optional[str]:
+        if category and category in self.titles:
+            return category
+        if tags and tags[0] in self.titles:
+            return tags[0]
+        return None
+
+    def name_of(self, transaction: Transaction) -> str:
+        """Название категории транзакции"""
+        cat_id = self.category_id(transaction)
+        return self.titles[cat_id] if cat_id is not None else UNCATEGORIZED
+
+    def title(self, cat_id: Optional[str]) -> str:
+        """Название категории по ID"""
+        if cat_id and cat_id in self.titles:
+            return self.titles[cat_id]
+        return UNCATEGORIZED
+
+    def resolve(self, category: str) -> List[str]:
+        """ID категорий по ID или названию (без учета регистра)"""
+        if category in self.titles:
+            return [category]
+        return list(self.ids_by_title.get(category.lower(), []))
+
+    def with_descendants(self, category_ids: Iterable[str]) -> Set[str]:
+        """Категории вместе со всеми вложенными"""
+        result: Set[str] = set()
+        for cat_id in category_ids:
+            result.add(cat_id)
+            result.update(self.descendants.get(cat_id, ()))
+        return result
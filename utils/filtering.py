@@ -2,23 +2,76 @@
 Фильтрация и обработка данных
 """
 
-from typing import Dict, List
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from models.category import Category
 from models.transaction import Transaction, TransactionFilter
+from utils.aggregation import to_kopecks
 
 
-def get_transaction_category_name(
-    transaction: Transaction, categories: Dict[str, Category]
-) -> str:
-    """Получить название категории для транзакции"""
-    if transaction.category and transaction.category in categories:
-        return categories[transaction.category].title
-    elif transaction.tag:
-        first_tag = transaction.tag[0]
-        if first_tag in categories:
-            return categories[first_tag].title
-    return "Без категории"
+def date_predicate(filter_params: TransactionFilter) -> Optional[Callable[[str], bool]]:
+    """Проверка даты YYYY-MM-DD по параметрам фильтра (None - без ограничений)"""
+    date_from = filter_params.date_from
+    date_to = filter_params.date_to
+
+    # Фильтрация по диапазону дат (приоритет)
+    if date_from and date_to:
+        return lambda date: date_from <= date <= date_to
+    if date_from:
+        return lambda date: date >= date_from
+    if date_to:
+        return lambda date: date <= date_to
+
+    # Фильтрация по году/месяцу/дню (старая логика)
+    if filter_params.year:
+        year_str = str(filter_params.year)
+        if filter_params.month:
+            if filter_params.day:
+                date_str = (
+                    f"{year_str}-{filter_params.month:02d}-{filter_params.day:02d}"
+                )
+                return lambda date: date == date_str
+            month_str = f"{year_str}-{filter_params.month:02d}"
+            return lambda date: date.startswith(month_str)
+        return lambda date: date.startswith(year_str)
+
+    return None
+
+
+def date_bounds(
+    filter_params: TransactionFilter,
+) -> Optional[Tuple[Optional[str], Optional[str]]]:
+    """Границы дат фильтра [от, до) для поиска по отсортированным датам
+
+    Условия date_predicate в виде полуинтервала строк: "<= дата" становится
+    "< дата + \\x00", а префикс года или месяца - "< префикс + \\uffff".
+    None - фильтр не ограничивает даты
+    """
+    if filter_params.date_from or filter_params.date_to:
+        upper = filter_params.date_to + "\x00" if filter_params.date_to else None
+        return filter_params.date_from or None, upper
+
+    if filter_params.year:
+        prefix = str(filter_params.year)
+        if filter_params.month:
+            prefix += f"-{filter_params.month:02d}"
+            if filter_params.day:
+                prefix += f"-{filter_params.day:02d}"
+                return prefix, prefix + "\x00"
+        return prefix, prefix + "\uffff"
+
+    return None
+
+
+def filter_months(filter_params: TransactionFilter) -> Optional[List[str]]:
+    """Месяцы YYYY-MM, если фильтр выбирает ровно целые месяцы, иначе None"""
+    if filter_params.date_from or filter_params.date_to:
+        return None
+    if not filter_params.year or filter_params.day:
+        return None
+    if filter_params.month:
+        return [f"{filter_params.year}-{filter_params.month:02d}"]
+    return [f"{filter_params.year}-{month:02d}" for month in range(1, 13)]
 
 
 def filter_transactions(
@@ -27,33 +80,9 @@ def filter_transactions(
     """Фильтрация транзакций по параметрам"""
     result = transactions
 
-    # Фильтрация по диапазону дат (приоритет)
-    if filter_params.date_from or filter_params.date_to:
-        if filter_params.date_from and filter_params.date_to:
-            result = [
-                t
-                for t in result
-                if filter_params.date_from <= t.date <= filter_params.date_to
-            ]
-        elif filter_params.date_from:
-            result = [t for t in result if t.date >= filter_params.date_from]
-        elif filter_params.date_to:
-            result = [t for t in result if t.date <= filter_params.date_to]
-    else:
-        # Фильтрация по году/месяцу/дню (старая логика)
-        if filter_params.year:
-            year_str = str(filter_params.year)
-            if filter_params.month:
-                if filter_params.day:
-                    date_str = (
-                        f"{year_str}-{filter_params.month:02d}-{filter_params.day:02d}"
-                    )
-                    result = [t for t in result if t.date == date_str]
-                else:
-                    month_str = f"{year_str}-{filter_params.month:02d}"
-                    result = [t for t in result if t.date.startswith(month_str)]
-            else:
-                result = [t for t in result if t.date.startswith(year_str)]
+    date_matches = date_predicate(filter_params)
+    if date_matches:
+        result = [t for t in result if date_matches(t.date)]
 
     if filter_params.uncategorized_only:
         result = [t for t in result if not t.category]
@@ -64,26 +93,70 @@ def filter_transactions(
     return result
 
 
-def find_duplicates(transactions: List[Transaction]) -> List[List[Transaction]]:
-    """Поиск возможных дублей транзакций"""
-    duplicates = []
-    processed = set()
-
-    for i, t1 in enumerate(transactions):
-        if i in processed:
-            continue
+def filter_records(
+    records: Iterable[Tuple[str, Dict[str, Any]]],
+    filter_params: TransactionFilter,
+    dates_checked: bool = False,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Фильтрация сырых записей транзакций без построения моделей
 
-        group = [t1]
-        for j, t2 in enumerate(transactions[i + 1 :], i + 1):
-            if (
-                t1.date == t2.date
-                and abs(t1.amount - t2.amount) < 0.01
-                and t1.payee == t2.payee
-            ):
-                group.append(t2)
-                processed.add(j)
+    Та же логика, что и в filter_transactions, но по полям словаря.
+    dates_checked - записи уже отобраны по датам (например, индексом)
+    """
+    date_matches = None if dates_checked else date_predicate(filter_params)
+    category_ids = filter_params.category_ids
 
+    for key, record in records:
+        if date_matches and not date_matches(record["date"]):
+            continue
+        if filter_params.uncategorized_only and record.get("category"):
+            continue
+        if category_ids and record.get("category") not in category_ids:
+            continue
+        yield key, record
+
+
+def find_duplicates(
+    records: Iterable[Tuple[str, Dict[str, Any]]], window_days: int = 0
+) -> List[List[str]]:
+    """Поиск возможных дублей среди сырых записей транзакций
+
+    Записи раскладываются по корзинам (сумма в копейках, получатель
+    без учета регистра) за один проход. Внутри корзины дубли - операции,
+    даты которых отстоят от первой операции группы не более чем на
+    window_days дней (0 - только в тот же день). Возвращаются ключи
+    записей: группы и ключи в них идут в порядке исходной выборки
+    """
+    keys: List[str] = []
+    # Номера дней по строке даты: в истории дат намного меньше, чем записей
+    days: Dict[str, int] = {}
+    buckets: Dict[Tuple[int, str], List[Tuple[int, int]]] = {}
+    for position, (record_key, record) in enumerate(records):
+        keys.append(record_key)
+        amount = to_kopecks(record.get("income")) - to_kopecks(record.get("outcome"))
+        payee = (record.get("payee") or "").strip().lower()
+        day = days.get(record["date"])
+        if day is None:
+            day = days[record["date"]] = date.fromisoformat(record["date"]).toordinal()
+        buckets.setdefault((amount, payee), []).append((day, position))
+
+    groups: List[List[int]] = []
+    for items in buckets.values():
+        if len(items) < 2:
+            continue
+        items.sort()
+        group = [items[0][1]]
+        start = items[0][0]
+        for day, position in items[1:]:
+            if day - start <= window_days:
+                group.append(position)
+                continue
+            if len(group) > 1:
+                groups.append(group)
+            group, start = [position], day
         if len(group) > 1:
-            duplicates.append(group)
+            groups.append(group)
 
-    return duplicates
+    groups = [sorted(group) for group in groups]
+    groups.sort(key=lambda group: group[0])
+    return [[keys[position] for position in group] for group in groups]
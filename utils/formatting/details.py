@@ -2,11 +2,18 @@
 Детальное форматирование транзакций
 """
 
-from typing import Dict, List
+from typing import Dict
 
 from models.account import Account
 from models.category import Category
-from models.transaction import Transaction
+from models.transaction import EXPENSE, INCOME, TRANSFER, Transaction
+
+# Названия типов операций
+TRANSACTION_TYPE_NAMES = {
+    TRANSFER: "Перевод между счетами",
+    INCOME: "Доход",
+    EXPENSE: "Расход",
+}
 
 
 class TransactionDetailFormatter:
@@ -15,7 +22,7 @@ class TransactionDetailFormatter:
     def format_transaction_details(
         self,
         transaction: Transaction,
-        transactions: List[Transaction],
+        kind: str,
         categories: Dict[str, Category],
         accounts: Dict[str, Account],
     ) -> str:
@@ -32,7 +39,7 @@ class TransactionDetailFormatter:
             self._format_optional_fields(transaction),
             self._format_receipt_info(transaction),
             self._format_geolocation(transaction),
-            self._format_transaction_type(transaction, transactions),
+            self._format_transaction_type(kind),
         ]
         return "\n".join(filter(None, parts))
 
@@ -78,17 +85,8 @@ class TransactionDetailFormatter:
             parts.append(f"Источник: {transaction.source}")
         return "\n".join(parts)
 
-    def _format_transaction_type(
-        self, transaction: Transaction, transactions: List[Transaction]
-    ) -> str:
-        if transaction.is_transfer(transactions) is True:
-            type_name = "Перевод между счетами"
-        elif transaction.is_income:
-            type_name = "Доход"
-        elif transaction.is_expense(transactions) is True:
-            type_name = "Расход"
-        else:
-            type_name = "Неопределенный"
+    def _format_transaction_type(self, kind: str) -> str:
+        type_name = TRANSACTION_TYPE_NAMES.get(kind, "Неопределенный")
         return f"\nТип операции: {type_name}"
 
     def _format_receipt_info(self, transaction: Transaction) -> str:
@@ -9,13 +9,22 @@ from models.transaction import Transaction
 
 
 def format_transactions(
-    transactions: List[Transaction], limit: int = 20, show_ids: bool = False
+    transactions: List[Transaction],
+    limit: int = 20,
+    show_ids: bool = False,
+    has_more: bool = False,
 ) -> str:
-    """Форматирование списка транзакций"""
-    if not transactions:
+    """Форматирование списка транзакций
+
+    has_more - список обрезан при выборке, и общее число транзакций неизвестно
+    """
+    if not transactions and not has_more:
         return "Транзакции не найдены"
 
-    result = f"Найдено транзакций: {len(transactions)}\n\n"
+    if has_more:
+        result = f"Показано транзакций: {len(transactions)} (есть еще)\n\n"
+    else:
+        result = f"Найдено транзакций: {len(transactions)}\n\n"
 
     for i, t in enumerate(transactions[:limit], 1):
         payee = (t.payee or "Без получателя")[:25]
@@ -26,7 +35,9 @@ def format_transactions(
         else:
             result += f"{i:2d}. {t.date} | {amount:>10} | {payee}\n"
 
-    if len(transactions) > limit:
+    if has_more:
+        result += "\n... есть еще транзакции: увеличьте limit или уточните фильтр"
+    elif len(transactions) > limit:
         result += f"\n... и еще {len(transactions) - limit} транзакций"
 
     return result
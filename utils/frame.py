@@ -0,0 +1,112 @@
+"""
+Колоночное представление транзакций для аналитики
+"""
+
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.transaction import EXPENSE, INCOME, OTHER, TRANSFER
+from utils.aggregation import Aggregation, to_kopecks
+from utils.categories import CategoryResolver
+
+# Коды типов операций в колонке kinds
+KIND_NAMES = (INCOME, EXPENSE, TRANSFER, OTHER)
+KIND_CODES = {kind: code for code, kind in enumerate(KIND_NAMES)}
+
+
+class Interner:
+    """Таблица строк с целочисленными кодами"""
+
+    def __init__(self) -> None:
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        """Код строки (-1 для пустого значения)"""
+        if not value:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class TransactionFrame:
+    """Транзакции снимка в виде параллельных колонок
+
+    Строки идут в порядке индекса дат, поэтому период фильтра - это
+    срез [start, end) по позициям DateIndex. Суммы хранятся в копейках,
+    категории и получатели - кодами в таблицах строк, а группировка
+    идет по целочисленным ключам без построения моделей транзакций
+    """
+
+    def __init__(self) -> None:
+        self.keys: List[str] = []
+        self.kinds = array("b")
+        self.income = array("q")
+        self.outcome = array("q")
+        self.categories = array("i")
+        self.payees = array("i")
+        self.category_names = Interner()
+        self.payee_names = Interner()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def build(
+        cls,
+        keys: List[str],
+        records: Dict[str, Dict[str, Any]],
+        kinds: Dict[str, str],
+        resolver: CategoryResolver,
+    ) -> "TransactionFrame":
+        """Колонки по записям транзакций в заданном порядке"""
+        frame = cls()
+        frame.keys = keys
+        for key in keys:
+            record = records[key]
+            frame.kinds.append(KIND_CODES[kinds.get(record["id"], OTHER)])
+            frame.income.append(to_kopecks(record.get("income")))
+            frame.outcome.append(to_kopecks(record.get("outcome")))
+            frame.categories.append(
+                frame.category_names.code(resolver.record_name(record))
+            )
+            frame.payees.append(frame.payee_names.code(record.get("payee")))
+        return frame
+
+    def aggregate(self, start: int = 0, end: Optional[int] = None) -> Aggregation:
+        """Сводка по строкам [start, end)
+
+        Строки сначала группируются по (тип, категория, получатель)
+        с целочисленными суммами, затем группы добавляются в сводку
+        """
+        rows = slice(start, end)
+        groups: Dict[Tuple[int, int, int], List[int]] = {}
+        for group_key, income, outcome in zip(
+            zip(self.kinds[rows], self.categories[rows], self.payees[rows]),
+            self.income[rows],
+            self.outcome[rows],
+        ):
+            group = groups.get(group_key)
+            if group is None:
+                groups[group_key] = [1, income, outcome]
+            else:
+                group[0] += 1
+                group[1] += income
+                group[2] += outcome
+
+        result = Aggregation()
+        categories = self.category_names.values
+        payees = self.payee_names.values
+        for (kind, category, payee), (count, income, outcome) in groups.items():
+            result.add_group(
+                KIND_NAMES[kind],
+                categories[category],
+                payees[payee] if payee >= 0 else None,
+                income,
+                outcome,
+                count,
+            )
+        return result
@@ -0,0 +1,229 @@
+"""
+Индексы транзакций для быстрых выборок
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from models.transaction import TransactionFilter
+from utils.filtering import date_bounds
+
+
+class DateIndex:
+    """Ключи транзакций, отсортированные по дате
+
+    Выборка по периоду - два бинарных поиска и срез, без просмотра
+    записей за пределами периода. Внутри одной даты сохраняется
+    исходный порядок записей
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, str]]) -> None:
+        pairs = sorted(items, key=lambda item: item[1])
+        self.keys: List[str] = [key for key, _ in pairs]
+        self.dates: List[str] = [date for _, date in pairs]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def positions(self, lower: Optional[str], upper: Optional[str]) -> Tuple[int, int]:
+        """Позиции [start, end) дат в полуинтервале [lower, upper)"""
+        start = bisect_left(self.dates, lower) if lower is not None else 0
+        end = bisect_left(self.dates, upper) if upper is not None else len(self.dates)
+        return start, end
+
+    def range(self, lower: Optional[str], upper: Optional[str]) -> List[str]:
+        """Ключи с датами в полуинтервале [lower, upper)"""
+        start, end = self.positions(lower, upper)
+        return self.keys[start:end]
+
+    def select_positions(self, filter_params: TransactionFilter) -> Tuple[int, int]:
+        """Позиции [start, end) транзакций, подходящих под даты фильтра"""
+        bounds = date_bounds(filter_params)
+        if bounds is None:
+            return 0, len(self.keys)
+        return self.positions(*bounds)
+
+    def select(self, filter_params: TransactionFilter) -> List[str]:
+        """Ключи транзакций, подходящих под даты фильтра"""
+        start, end = self.select_positions(filter_params)
+        return self.keys[start:end]
+
+
+# Упорядоченное множество ключей транзакций
+KeySet = Dict[str, None]
+
+
+# Длина n-грамм текстового индекса
+NGRAM_SIZE = 3
+
+
+def normalize_text(text: str) -> str:
+    """Текст в виде ключа индекса (поиск без учета регистра)"""
+    return text.lower()
+
+
+def ngrams(text: str) -> Set[str]:
+    """N-граммы текста"""
+    return {text[i : i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def intersect(keys: Optional[KeySet], other: KeySet) -> KeySet:
+    """Пересечение кандидатов (None - кандидаты еще не ограничены)"""
+    if keys is None:
+        return other
+    return {key: None for key in keys if key in other}
+
+
+class TextIndex:
+    """Поиск подстроки в текстовом поле транзакций
+
+    Различные тексты хранятся в нижнем регистре вместе с ключами
+    транзакций, а для каждой триграммы - тексты, где она встречается.
+    Подстрока ищется только среди текстов, содержащих все ее триграммы
+    """
+
+    def __init__(self) -> None:
+        self.texts: Dict[str, KeySet] = {}
+        self.ngrams: Dict[str, Set[str]] = {}
+
+    def add(self, key: str, text: str) -> None:
+        """Добавление текста транзакции"""
+        text = normalize_text(text)
+        keys = self.texts.get(text)
+        if keys is None:
+            keys = self.texts[text] = {}
+            for gram in ngrams(text):
+                self.ngrams.setdefault(gram, set()).add(text)
+        keys[key] = None
+
+    def remove(self, key: str, text: str) -> None:
+        """Удаление текста транзакции"""
+        text = normalize_text(text)
+        keys = self.texts.get(text)
+        if keys is None:
+            return
+        keys.pop(key, None)
+        if keys:
+            return
+        del self.texts[text]
+        for gram in ngrams(text):
+            texts = self.ngrams.get(gram)
+            if texts is not None:
+                texts.discard(text)
+                if not texts:
+                    del self.ngrams[gram]
+
+    def search(self, query: str) -> KeySet:
+        """Транзакции, текст которых содержит подстроку"""
+        query = normalize_text(query)
+        grams = ngrams(query)
+        if grams:
+            postings = sorted((self.ngrams.get(gram, set()) for gram in grams), key=len)
+            candidates: Iterable[str] = sorted(set.intersection(*postings))
+        else:
+            # Слишком короткий запрос: просматриваются различные тексты
+            candidates = self.texts
+
+        result: KeySet = {}
+        for text in candidates:
+            if query in text:
+                result.update(self.texts[text])
+        return result
+
+
+class TransactionIndexes:
+    """Хэш-индексы транзакций по значениям полей
+
+    Для каждой категории, тега, счета и торговца хранится множество
+    ключей транзакций, для получателей и комментариев - текстовые
+    индексы для поиска подстроки. Индексы обновляются по одной записи
+    при применении diff, поэтому выборка по ним зависит от размера
+    результата, а не от всей истории операций
+    """
+
+    def __init__(self) -> None:
+        self.by_category: Dict[str, KeySet] = {}
+        self.by_tag: Dict[str, KeySet] = {}
+        self.by_account: Dict[str, KeySet] = {}
+        self.by_merchant: Dict[str, KeySet] = {}
+        self.payees = TextIndex()
+        self.original_payees = TextIndex()
+        self.comments = TextIndex()
+
+    @classmethod
+    def build(cls, items: Iterable[Tuple[str, Dict[str, Any]]]) -> "TransactionIndexes":
+        """Индексы по всем записям транзакций"""
+        indexes = cls()
+        for key, record in items:
+            indexes.add(key, record)
+        return indexes
+
+    def add(self, key: str, record: Dict[str, Any]) -> None:
+        """Добавление записи в индексы"""
+        for index, value in self._entries(record):
+            index.setdefault(value, {})[key] = None
+        for text_index, text in self._texts(record):
+            text_index.add(key, text)
+
+    def remove(self, key: str, record: Dict[str, Any]) -> None:
+        """Удаление записи из индексов"""
+        for index, value in self._entries(record):
+            keys = index.get(value)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del index[value]
+        for text_index, text in self._texts(record):
+            text_index.remove(key, text)
+
+    def _entries(
+        self, record: Dict[str, Any]
+    ) -> Iterator[Tuple[Dict[str, KeySet], str]]:
+        if record.get("category"):
+            yield self.by_category, record["category"]
+        for tag in set(record.get("tag") or ()):
+            yield self.by_tag, tag
+        accounts = {
+            record.get("account"),
+            record.get("incomeAccount"),
+            record.get("outcomeAccount"),
+        }
+        for account in accounts:
+            if account:
+                yield self.by_account, account
+        if record.get("merchant"):
+            yield self.by_merchant, record["merchant"]
+
+    def _texts(self, record: Dict[str, Any]) -> Iterator[Tuple[TextIndex, str]]:
+        if record.get("payee"):
+            yield self.payees, record["payee"]
+        if record.get("originalPayee"):
+            yield self.original_payees, record["originalPayee"]
+        if record.get("comment"):
+            yield self.comments, record["comment"]
+
+    @staticmethod
+    def lookup(index: Dict[str, KeySet], values: Iterable[str]) -> KeySet:
+        """Объединение множеств ключей для нескольких значений"""
+        result: KeySet = {}
+        for value in values:
+            result.update(index.get(value, {}))
+        return result
+
+    def category_keys(self, category_ids: Iterable[str]) -> KeySet:
+        """Транзакции с любой из категорий в поле category или в тегах"""
+        category_ids = list(category_ids)
+        result = self.lookup(self.by_category, category_ids)
+        result.update(self.lookup(self.by_tag, category_ids))
+        return result
+
+    def payee_keys(self, query: str) -> KeySet:
+        """Транзакции, в получателе или исходном названии из банка которых
+        есть подстрока (без учета регистра)"""
+        result = self.payees.search(query)
+        result.update(self.original_payees.search(query))
+        return result
+
+    def comment_keys(self, query: str) -> KeySet:
+        """Транзакции, в комментарии которых есть подстрока (без учета регистра)"""
+        return self.comments.search(query)